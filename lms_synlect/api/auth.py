@@ -5,10 +5,66 @@ Provides login, register, logout, and user profile endpoints
 
 import frappe
 from frappe import _
-import json
+from frappe.utils.caching import site_cache
+import pickle
 from datetime import datetime, timedelta
 import secrets
 
+from lms_synlect.api.utils import json_loads
+
+# Seconds a user profile payload stays in the cache
+USER_PROFILE_CACHE_TTL = 300
+
+# Refresh token lifetime in seconds (1 day, or 7 days with "remember me")
+REFRESH_TOKEN_TTL = 86400
+REMEMBER_ME_REFRESH_TOKEN_TTL = 86400 * 7
+
+# Exceptions that are part of normal auth flows (bad credentials, unknown user) and are not logged
+_EXPECTED_ERRORS = (frappe.AuthenticationError, frappe.DoesNotExistError)
+
+# Attempts allowed per client IP within the rate limit window (seconds)
+AUTH_RATE_LIMIT = 10
+AUTH_RATE_LIMIT_WINDOW = 60
+
+# Seconds a translated static message is reused, so Translation edits apply without a restart
+TRANSLATION_CACHE_TTL = 300
+
+# Roles that classify a user for the React frontend
+_INSTRUCTOR_ROLES = frozenset({"Course Creator", "Instructor"})
+_ADMIN_ROLES = frozenset({"System Manager", "Administrator"})
+
+
+@site_cache(ttl=TRANSLATION_CACHE_TTL, maxsize=1024)
+def _translate(message, lang):
+    return _(message, lang=lang)
+
+
+def _t(message):
+    """Translate a static message, memoized per site and language for TRANSLATION_CACHE_TTL"""
+    return _translate(message, frappe.local.lang)
+
+
+def _log_unexpected(error, message):
+    """Write an Error Log row for `error` unless it is an expected auth failure"""
+    if not isinstance(error, _EXPECTED_ERRORS):
+        frappe.log_error(f"{message}: {str(error)}", "Auth API")
+
+
+def _is_rate_limited(action):
+    """Count an attempt of `action` for the client IP and tell whether it is over the limit"""
+    cache = frappe.cache()
+    key = cache.make_key(f"rl:{action}:{frappe.local.request_ip}")
+    pipe = cache.pipeline()
+    pipe.incr(key)
+    pipe.ttl(key)
+    attempts, ttl = pipe.execute()
+
+    # Set the window on the first attempt, and heal a counter left without a TTL
+    # (e.g. a worker died between INCR and EXPIRE) so an IP is never locked out for good
+    if ttl < 0:
+        cache.expire(key, AUTH_RATE_LIMIT_WINDOW)
+    return attempts > AUTH_RATE_LIMIT
+
 
 def generate_api_token(user):
     """Generate a simple API token for the user session"""
@@ -28,33 +84,112 @@ def validate_api_token(token):
         return None
 
     cache_key = f"api_token:{token}"
-    user = frappe.cache().get_value(cache_key)
-    return user
+    return frappe.cache().get_value(cache_key)
+
+
+def _refresh_token_key(token):
+    """Cache key holding the user a refresh token was issued to"""
+    return f"refresh_token:{token}"
+
+
+def generate_refresh_token(user, expires_in=REFRESH_TOKEN_TTL):
+    """
+    Issue a random refresh token for the user
+
+    The token is stored in the cache (so it can be revoked) and listed under the
+    user, so logout and password changes can revoke all of them; both writes go
+    in one round-trip.
+    """
+    token = secrets.token_urlsafe(32)
+
+    cache = frappe.cache()
+    user_key = cache.make_key(f"refresh_tokens:{user}")
+    pipe = cache.pipeline()
+    pipe.setex(cache.make_key(_refresh_token_key(token)), expires_in, pickle.dumps(user))
+    pipe.sadd(user_key, token)
+    pipe.expire(user_key, REMEMBER_ME_REFRESH_TOKEN_TTL)
+    pipe.execute()
+
+    return token
+
+
+def consume_refresh_token(token):
+    """Validate a refresh token and revoke it in the same round-trip; returns the user or None"""
+    if not token or not isinstance(token, str):
+        return None
+
+    cache = frappe.cache()
+    key = cache.make_key(_refresh_token_key(token))
+    pipe = cache.pipeline()
+    pipe.get(key)
+    pipe.delete(key)
+    value, _deleted = pipe.execute()
+
+    return pickle.loads(value) if value is not None else None
+
+
+def revoke_refresh_tokens(user):
+    """Revoke every refresh token issued to the user"""
+    cache = frappe.cache()
+    user_key = cache.make_key(f"refresh_tokens:{user}")
+    pipe = cache.pipeline()
+    pipe.smembers(user_key)
+    pipe.delete(user_key)
+    tokens, _deleted = pipe.execute()
+
+    if tokens:
+        pipe = cache.pipeline()
+        for token in tokens:
+            token = token.decode() if isinstance(token, bytes) else token
+            pipe.delete(cache.make_key(_refresh_token_key(token)))
+        pipe.execute()
 
 
 def get_user_data(user):
-    """Get user data in the format expected by React frontend"""
-    user_doc = frappe.get_doc("User", user)
+    """Get user data in the format expected by React frontend (cached per user)"""
+    cache_key = f"user_profile:{user}"
+    user_data = frappe.cache().get_value(cache_key)
+    if user_data:
+        return user_data
+
+    user_data = build_user_data(user)
+    frappe.cache().set_value(cache_key, user_data, expires_in_sec=USER_PROFILE_CACHE_TTL)
+    return user_data
+
+
+def clear_user_profile_cache(doc, method=None):
+    """Drop the cached profile of the user affected by a User change"""
+    frappe.cache().delete_value(f"user_profile:{doc.name}")
+
+
+def build_user_data(user):
+    """Build the user payload from the database in a single round-trip"""
+    user_rows = frappe.db.sql(
+        """
+        SELECT u.name, u.email, u.full_name, u.user_image, u.enabled, u.creation,
+            GROUP_CONCAT(r.role) AS roles
+        FROM `tabUser` u
+        LEFT JOIN `tabHas Role` r ON r.parent = u.name AND r.parenttype = 'User'
+        WHERE u.name = %s
+        GROUP BY u.name
+        """,
+        user,
+        as_dict=True
+    )
+    if not user_rows:
+        frappe.throw(_t("User {0} not found").format(user), frappe.DoesNotExistError)
+
+    user_doc = user_rows[0]
 
     # Determine role
-    roles = frappe.get_roles(user)
-    if "Course Creator" in roles or "Instructor" in roles:
+    roles = frozenset((user_doc.roles or "").split(","))
+    if roles & _INSTRUCTOR_ROLES:
         role = "instructor"
-    elif "System Manager" in roles or "Administrator" in roles:
+    elif roles & _ADMIN_ROLES:
         role = "admin"
     else:
         role = "student"
 
-    # Get LMS Member info if exists
-    member_info = {}
-    if frappe.db.exists("LMS Enrollment", {"member": user}):
-        member_info = frappe.get_all(
-            "LMS Enrollment",
-            filters={"member": user},
-            fields=["name"],
-            limit=1
-        )
-
     # Get instructor ID if user is instructor
     instructor_id = None
     student_id = None
@@ -69,9 +204,7 @@ def get_user_data(user):
 
     # Parse full name
     full_name = user_doc.full_name or ""
-    name_parts = full_name.split(" ", 1)
-    first_name = name_parts[0] if name_parts else ""
-    last_name = name_parts[1] if len(name_parts) > 1 else ""
+    first_name, _sep, last_name = full_name.partition(" ")
 
     return {
         "id": user_doc.name,
@@ -110,9 +243,15 @@ def login(email=None, password=None, remember_me=False):
         }
     """
     try:
+        if _is_rate_limited("login"):
+            return {
+                "success": False,
+                "message": _t("Too many attempts. Please try again later.")
+            }
+
         # Parse JSON if data comes as string
         if not email and frappe.request.data:
-            data = json.loads(frappe.request.data)
+            data = json_loads(frappe.request.data)
             email = data.get("email")
             password = data.get("password")
             remember_me = data.get("rememberMe", False)
@@ -120,7 +259,7 @@ def login(email=None, password=None, remember_me=False):
         if not email or not password:
             return {
                 "success": False,
-                "message": _("Email and password are required")
+                "message": _t("Email and password are required")
             }
 
         # Authenticate user using Frappe's built-in method
@@ -130,42 +269,35 @@ def login(email=None, password=None, remember_me=False):
         except frappe.AuthenticationError:
             return {
                 "success": False,
-                "message": _("Invalid email or password")
+                "message": _t("Invalid email or password")
             }
 
         user = frappe.session.user
 
         # Generate tokens
         token = generate_api_token(user)
-        refresh_token = secrets.token_urlsafe(32)
-
-        # Store refresh token with longer expiry
-        refresh_expiry = 86400 * 7 if remember_me else 86400  # 7 days or 1 day
-        frappe.cache().set_value(
-            f"refresh_token:{refresh_token}",
+        refresh_token = generate_refresh_token(
             user,
-            expires_in_sec=refresh_expiry
+            expires_in=REMEMBER_ME_REFRESH_TOKEN_TTL if remember_me else REFRESH_TOKEN_TTL
         )
 
         # Get user data
         user_data = get_user_data(user)
 
-        frappe.db.commit()
-
         return {
             "success": True,
             "user": user_data,
             "token": token,
             "refreshToken": refresh_token,
             "expiresIn": 3600,
-            "message": _("Login successful")
+            "message": _t("Login successful")
         }
 
     except Exception as e:
-        frappe.log_error(f"Login error: {str(e)}", "Auth API")
+        _log_unexpected(e, "Login error")
         return {
             "success": False,
-            "message": _("An error occurred during login")
+            "message": _t("An error occurred during login")
         }
 
 
@@ -194,7 +326,7 @@ def register(full_name=None, email=None, password=None, confirm_password=None, r
     try:
         # Parse JSON if data comes as string
         if not email and frappe.request.data:
-            data = json.loads(frappe.request.data)
+            data = json_loads(frappe.request.data)
             full_name = data.get("fullName") or data.get("full_name")
             email = data.get("email")
             password = data.get("password")
@@ -205,33 +337,40 @@ def register(full_name=None, email=None, password=None, confirm_password=None, r
         if not all([full_name, email, password]):
             return {
                 "success": False,
-                "message": _("Full name, email, and password are required")
+                "message": _t("Full name, email, and password are required")
             }
 
         if password != confirm_password:
             return {
                 "success": False,
-                "message": _("Passwords do not match")
+                "message": _t("Passwords do not match")
             }
 
         # Check password strength
         if len(password) < 8:
             return {
                 "success": False,
-                "message": _("Password must be at least 8 characters long")
+                "message": _t("Password must be at least 8 characters long")
             }
 
         # Check if user already exists
         if frappe.db.exists("User", email):
             return {
                 "success": False,
-                "message": _("An account with this email already exists")
+                "message": _t("An account with this email already exists")
             }
 
         # Parse name
-        name_parts = full_name.split(" ", 1)
-        first_name = name_parts[0]
-        last_name = name_parts[1] if len(name_parts) > 1 else ""
+        first_name, _sep, last_name = full_name.partition(" ")
+
+        # Assign role based on selection, set on the new document so the
+        # user (and its password hash) is saved only once
+        roles = []
+        if role == "instructor":
+            roles.append({"role": "Course Creator"})
+        elif frappe.db.exists("Role", "LMS Student"):
+            # Add LMS Student role if it exists
+            roles.append({"role": "LMS Student"})
 
         # Create user
         user = frappe.get_doc({
@@ -242,33 +381,18 @@ def register(full_name=None, email=None, password=None, confirm_password=None, r
             "enabled": 1,
             "new_password": password,
             "send_welcome_email": 0,
-            "user_type": "Website User"
+            "user_type": "Website User",
+            "roles": roles
         })
 
         user.insert(ignore_permissions=True)
 
-        # Assign role based on selection
-        if role == "instructor":
-            user.add_roles("Course Creator")
-        else:
-            # Add LMS Student role if it exists
-            if frappe.db.exists("Role", "LMS Student"):
-                user.add_roles("LMS Student")
-
-        frappe.db.commit()
-
         # Auto-login the user
         frappe.local.login_manager.login_as(email)
 
         # Generate tokens
         token = generate_api_token(email)
-        refresh_token = secrets.token_urlsafe(32)
-
-        frappe.cache().set_value(
-            f"refresh_token:{refresh_token}",
-            email,
-            expires_in_sec=86400
-        )
+        refresh_token = generate_refresh_token(email)
 
         # Get user data
         user_data = get_user_data(email)
@@ -279,14 +403,14 @@ def register(full_name=None, email=None, password=None, confirm_password=None, r
             "token": token,
             "refreshToken": refresh_token,
             "expiresIn": 3600,
-            "message": _("Registration successful")
+            "message": _t("Registration successful")
         }
 
     except Exception as e:
-        frappe.log_error(f"Registration error: {str(e)}", "Auth API")
+        _log_unexpected(e, "Registration error")
         return {
             "success": False,
-            "message": str(e) if frappe.conf.developer_mode else _("An error occurred during registration")
+            "message": str(e) if frappe.conf.developer_mode else _t("An error occurred during registration")
         }
 
 
@@ -309,19 +433,21 @@ def logout():
             # Remove token from cache
             frappe.cache().delete_value(f"api_token:{token}")
 
+        if frappe.session.user != "Guest":
+            revoke_refresh_tokens(frappe.session.user)
+
         frappe.local.login_manager.logout()
-        frappe.db.commit()
 
         return {
             "success": True,
-            "message": _("Logged out successfully")
+            "message": _t("Logged out successfully")
         }
 
     except Exception as e:
-        frappe.log_error(f"Logout error: {str(e)}", "Auth API")
+        _log_unexpected(e, "Logout error")
         return {
             "success": False,
-            "message": _("An error occurred during logout")
+            "message": _t("An error occurred during logout")
         }
 
 
@@ -342,7 +468,7 @@ def me():
         if user == "Guest":
             return {
                 "success": False,
-                "message": _("Not authenticated")
+                "message": _t("Not authenticated")
             }
 
         user_data = get_user_data(user)
@@ -353,10 +479,10 @@ def me():
         }
 
     except Exception as e:
-        frappe.log_error(f"Get user error: {str(e)}", "Auth API")
+        _log_unexpected(e, "Get user error")
         return {
             "success": False,
-            "message": _("An error occurred while fetching user data")
+            "message": _t("An error occurred while fetching user data")
         }
 
 
@@ -380,51 +506,41 @@ def refresh_token(refresh_token=None):
     try:
         # Parse JSON if data comes as string
         if not refresh_token and frappe.request.data:
-            data = json.loads(frappe.request.data)
+            data = json_loads(frappe.request.data)
             refresh_token = data.get("refreshToken") or data.get("refresh_token")
 
         if not refresh_token:
             return {
                 "success": False,
-                "message": _("Refresh token is required")
+                "message": _t("Refresh token is required")
             }
 
         # Validate refresh token
-        cache_key = f"refresh_token:{refresh_token}"
-        user = frappe.cache().get_value(cache_key)
+        user = consume_refresh_token(refresh_token)
 
         if not user:
             return {
                 "success": False,
-                "message": _("Invalid or expired refresh token")
+                "message": _t("Invalid or expired refresh token")
             }
 
-        # Delete old refresh token
-        frappe.cache().delete_value(cache_key)
-
         # Generate new tokens
         new_token = generate_api_token(user)
-        new_refresh_token = secrets.token_urlsafe(32)
-
-        frappe.cache().set_value(
-            f"refresh_token:{new_refresh_token}",
-            user,
-            expires_in_sec=86400
-        )
+        new_refresh_token = generate_refresh_token(user)
 
         return {
             "success": True,
             "token": new_token,
             "refreshToken": new_refresh_token,
             "expiresIn": 3600,
-            "message": _("Token refreshed successfully")
+            "message": _t("Token refreshed successfully")
         }
 
     except Exception as e:
-        frappe.log_error(f"Token refresh error: {str(e)}", "Auth API")
+        _log_unexpected(e, "Token refresh error")
         return {
             "success": False,
-            "message": _("An error occurred while refreshing token")
+            "message": _t("An error occurred while refreshing token")
         }
 
 
@@ -443,22 +559,28 @@ def forgot_password(email=None):
         }
     """
     try:
+        if _is_rate_limited("forgot_password"):
+            return {
+                "success": False,
+                "message": _t("Too many attempts. Please try again later.")
+            }
+
         # Parse JSON if data comes as string
         if not email and frappe.request.data:
-            data = json.loads(frappe.request.data)
+            data = json_loads(frappe.request.data)
             email = data.get("email")
 
         if not email:
             return {
                 "success": False,
-                "message": _("Email is required")
+                "message": _t("Email is required")
             }
 
         if not frappe.db.exists("User", email):
             # Don't reveal if user exists or not for security
             return {
                 "success": True,
-                "message": _("If an account with this email exists, you will receive a password reset link")
+                "message": _t("If an account with this email exists, you will receive a password reset link")
             }
 
         # Use Frappe's built-in password reset
@@ -467,14 +589,14 @@ def forgot_password(email=None):
 
         return {
             "success": True,
-            "message": _("If an account with this email exists, you will receive a password reset link")
+            "message": _t("If an account with this email exists, you will receive a password reset link")
         }
 
     except Exception as e:
-        frappe.log_error(f"Forgot password error: {str(e)}", "Auth API")
+        _log_unexpected(e, "Forgot password error")
         return {
             "success": False,
-            "message": _("An error occurred while processing your request")
+            "message": _t("An error occurred while processing your request")
         }
 
 
@@ -497,7 +619,7 @@ def change_password(current_password=None, new_password=None, confirm_password=N
     try:
         # Parse JSON if data comes as string
         if not current_password and frappe.request.data:
-            data = json.loads(frappe.request.data)
+            data = json_loads(frappe.request.data)
             current_password = data.get("currentPassword") or data.get("current_password")
             new_password = data.get("newPassword") or data.get("new_password")
             confirm_password = data.get("confirmPassword") or data.get("confirm_password")
@@ -507,25 +629,25 @@ def change_password(current_password=None, new_password=None, confirm_password=N
         if user == "Guest":
             return {
                 "success": False,
-                "message": _("Not authenticated")
+                "message": _t("Not authenticated")
             }
 
         if not all([current_password, new_password]):
             return {
                 "success": False,
-                "message": _("Current password and new password are required")
+                "message": _t("Current password and new password are required")
             }
 
         if new_password != confirm_password:
             return {
                 "success": False,
-                "message": _("New passwords do not match")
+                "message": _t("New passwords do not match")
             }
 
         if len(new_password) < 8:
             return {
                 "success": False,
-                "message": _("Password must be at least 8 characters long")
+                "message": _t("Password must be at least 8 characters long")
             }
 
         # Verify current password
@@ -535,23 +657,24 @@ def change_password(current_password=None, new_password=None, confirm_password=N
         except frappe.AuthenticationError:
             return {
                 "success": False,
-                "message": _("Current password is incorrect")
+                "message": _t("Current password is incorrect")
             }
 
         # Update password
         from frappe.utils.password import update_password
         update_password(user, new_password)
 
-        frappe.db.commit()
+        # Sessions on other devices must sign in again with the new password
+        revoke_refresh_tokens(user)
 
         return {
             "success": True,
-            "message": _("Password changed successfully")
+            "message": _t("Password changed successfully")
         }
 
     except Exception as e:
-        frappe.log_error(f"Change password error: {str(e)}", "Auth API")
+        _log_unexpected(e, "Change password error")
         return {
             "success": False,
-            "message": _("An error occurred while changing password")
+            "message": _t("An error occurred while changing password")
         }
@@ -5,21 +5,247 @@ Provides course listing, filtering, and course details endpoints
 
 import frappe
 from frappe import _
+from collections import defaultdict
+import hashlib
 import json
-from frappe.utils import cint, flt
+import pickle
+from frappe.utils import cint, flt, now, now_datetime, sbool
+from frappe.utils.caching import request_cache, site_cache
+
+from lms_synlect.api.utils import json_body, json_loads
+
+# LMS Course columns read by format_course_for_frontend for course cards
+COURSE_LIST_FIELDS = [
+    "name",
+    "title",
+    "short_introduction",
+    "description",
+    "image",
+    "hero_image",
+    "course_image",
+    "owner",
+    "instructor",
+    "category",
+    "level",
+    "difficulty",
+    "course_price",
+    "price",
+    "paid",
+    "duration",
+    "video_link",
+    "featured",
+    "is_featured",
+    "creation",
+    "modified",
+    "published"
+]
+
+# Redis hash of formatted course cards: field = course name, value = (modified, card)
+COURSE_CARD_CACHE_KEY = "course_cards"
+# Seconds the card hash lives after its last write, so cards missed by hooks age out
+COURSE_CARD_CACHE_TTL = 3600
+
+# Near-static lookup lists served to every page load; invalidated through doc_events
+CATEGORIES_CACHE_KEY = "lms:course_categories"
+INSTRUCTORS_CACHE_KEY = "lms:instructors"
+LOOKUP_CACHE_TTL = 3600
+FEATURED_COURSES_CACHE_PREFIX = "lms:featured_courses:"
+FEATURED_COURSES_CACHE_TTL = 300
+
+# FULLTEXT index over LMS Course title/short_introduction (see patches/v0_0)
+COURSE_SEARCH_INDEX = "course_search"
+
+# Live class columns read when formatting live classes; the field names vary
+# between live class DocTypes, so only those present are selected
+LIVE_CLASS_FIELDS = [
+    "name",
+    "title",
+    "class_title",
+    "description",
+    "course",
+    "instructor",
+    "owner",
+    "start_time",
+    "end_time",
+    "duration",
+    "status",
+    "meeting_url",
+    "zoom_link",
+    "join_url",
+    "start_url",
+    "url",
+    "link",
+    "meeting_id",
+    "zoom_meeting_id",
+    "max_participants",
+    "current_participants",
+    "is_recorded",
+    "record_session",
+    "recording_url",
+    "creation"
+]
+
+# Lesson totals per course, invalidated through Course Chapter/Course Lesson doc_events
+LESSON_COUNT_CACHE_TTL = 86400
+
+# Cache-based progress (used when no progress DocType is installed) is kept for a year
+PROGRESS_CACHE_TTL = 86400 * 365
+# Field marking a progress hash whose legacy per-lesson keys were already copied
+LEGACY_PROGRESS_CHECKED = "__legacy_checked__"
+
+# DocTypes and their columns only change on install/migrate, so they are
+# memoized per worker for this long
+DOCTYPE_CACHE_TTL = 300
+
+# Listing totals stop counting here unless the caller asks for an accurate count
+COURSE_COUNT_LIMIT = 1000
+COURSE_COUNT_CACHE_TTL = 60
+
+
+@site_cache(ttl=DOCTYPE_CACHE_TTL)
+def _has_dt(doctype):
+    """Whether a DocType is installed, memoized per site in this worker"""
+    return bool(frappe.db.exists("DocType", doctype))
+
+
+def _progress_doctype():
+    """The installed course progress DocType, or None to fall back to cache-based progress"""
+    for doctype in ("LMS Course Progress", "Course Progress"):
+        if _has_dt(doctype):
+            return doctype
+    return None
+
+
+def _live_class_doctype():
+    """The installed live class DocType, or None when live classes are not configured"""
+    for doctype in ("LMS Live Class", "Live Class"):
+        if _has_dt(doctype):
+            return doctype
+    return None
+
+
+def get_live_class_fields(live_class_doctype):
+    """LIVE_CLASS_FIELDS limited to the columns that exist on the live class DocType"""
+    return [field for field in LIVE_CLASS_FIELDS if _has_col(live_class_doctype, field)]
+
+
+@site_cache(ttl=DOCTYPE_CACHE_TTL)
+def _table_columns(doctype):
+    """Column names of a DocType's table, memoized per site in this worker"""
+    return frozenset(frappe.db.get_table_columns(doctype))
+
+
+def _has_col(doctype, column):
+    """Whether a DocType's table has a column"""
+    return column in _table_columns(doctype)
+
+
+@request_cache
+def _course_search_columns():
+    """Columns covered by the course FULLTEXT index, or an empty list when it is missing"""
+    if frappe.db.db_type != "mariadb":
+        return []
+    return [
+        row.Column_name
+        for row in frappe.db.sql(
+            "SHOW INDEX FROM `tabLMS Course` WHERE Key_name = %s",
+            COURSE_SEARCH_INDEX,
+            as_dict=True
+        )
+    ]
+
+
+@request_cache
+def _user_roles(user):
+    """A user's roles, read once per request so role changes apply on the next call"""
+    return frozenset(frappe.get_roles(user))
+
+
+def search_course_names(search):
+    """
+    Names of courses whose title or introduction match `search` through the FULLTEXT index
+
+    Every word is matched as a prefix, so partially typed words still find courses.
+
+    Returns:
+        List of course names, or None when the index is unavailable or the search
+        has no indexable words and the caller should fall back to LIKE
+    """
+    columns = _course_search_columns()
+    # Drop boolean-mode operators so user input is only ever treated as words
+    words = "".join(c if c.isalnum() else " " for c in search).split()
+    if not columns or not words:
+        return None
+
+    match_columns = ", ".join(f"`{column}`" for column in columns)
+    return frappe.db.sql_list(
+        f"""
+        SELECT name
+        FROM `tabLMS Course`
+        WHERE MATCH({match_columns}) AGAINST (%s IN BOOLEAN MODE)
+        """,
+        " ".join(f"+{word}*" for word in words)
+    )
+
+
+def get_course_list_fields():
+    """COURSE_LIST_FIELDS limited to the columns that exist on this site"""
+    return [field for field in COURSE_LIST_FIELDS if _has_col("LMS Course", field)]
+
+
+def _safe_count(doctype, filters=None, or_filters=None, limit=COURSE_COUNT_LIMIT):
+    """
+    Count matching rows, stopping at `limit` so unindexed filters never scan the whole table
+
+    Results are cached for COURSE_COUNT_CACHE_TTL seconds per filter set.
+
+    Args:
+        limit: Cap on the count; pass None for an exact (uncapped) count
+
+    Returns:
+        (count, capped) where capped is True when more than `limit` rows match
+        and count is then `limit`
+    """
+    cache_key = "safe_count:" + hashlib.md5(
+        json.dumps([doctype, filters, or_filters, limit], sort_keys=True, default=str).encode()
+    ).hexdigest()
+    cached = frappe.cache().get_value(cache_key)
+    if cached is not None:
+        return cached
+
+    if limit is None:
+        count = frappe.get_all(
+            doctype,
+            filters=filters,
+            or_filters=or_filters,
+            fields=["count(name) as total_count"]
+        )[0].total_count
+        result = (count, False)
+    else:
+        # Count at most limit + 1 rows so we can tell whether the cap was hit
+        subquery = frappe.get_all(
+            doctype,
+            filters=filters,
+            or_filters=or_filters,
+            fields=["name"],
+            limit=limit + 1,
+            run=0
+        )
+        count = frappe.db.sql(f"SELECT COUNT(*) FROM ({subquery}) capped")[0][0]
+        result = (min(count, limit), count > limit)
+
+    frappe.cache().set_value(cache_key, result, expires_in_sec=COURSE_COUNT_CACHE_TTL)
+    return result
 
 
 def get_course_image(course_doc):
     """Get the course image URL - returns full URL for Frappe Cloud"""
-    image_path = None
-
     # Check various possible image field names in Frappe LMS
-    if hasattr(course_doc, 'image') and course_doc.image:
-        image_path = course_doc.image
-    elif hasattr(course_doc, 'hero_image') and course_doc.hero_image:
-        image_path = course_doc.hero_image
-    elif hasattr(course_doc, 'course_image') and course_doc.course_image:
-        image_path = course_doc.course_image
+    image_path = (
+        course_doc.get('image') or
+        course_doc.get('hero_image') or
+        course_doc.get('course_image')
+    )
 
     if not image_path:
         return ""
@@ -32,22 +258,40 @@ def get_course_image(course_doc):
     return image_path
 
 
-def get_course_instructor(course_doc):
-    """Get instructor details for a course"""
+def get_instructors_bulk(instructor_ids):
+    """
+    Load name and avatar for many users with a single query
+
+    Returns:
+        {user_id: {"name", "full_name", "user_image"}}
+    """
+    instructor_ids = [instructor_id for instructor_id in instructor_ids if instructor_id]
+    if not instructor_ids:
+        return {}
+
+    users = frappe.get_all(
+        "User",
+        filters={"name": ["in", instructor_ids]},
+        fields=["name", "full_name", "user_image"]
+    )
+    return {user.name: user for user in users}
+
+
+def get_course_instructor(course_doc, instructor_map=None):
+    """Get instructor details for a course, optionally from a prefetched instructor map"""
     instructor_name = ""
     instructor_id = ""
     instructor_avatar = ""
 
     # Frappe LMS uses 'owner' or specific instructor field
-    if hasattr(course_doc, 'instructor') and course_doc.instructor:
-        instructor_id = course_doc.instructor
-    else:
-        instructor_id = course_doc.owner
+    instructor_id = course_doc.get('instructor') or course_doc.get('owner')
 
     if instructor_id:
-        user = frappe.get_doc("User", instructor_id)
-        instructor_name = user.full_name or instructor_id
-        instructor_avatar = user.user_image or ""
+        if instructor_map is None:
+            instructor_map = get_instructors_bulk([instructor_id])
+        user = instructor_map.get(instructor_id) or {}
+        instructor_name = user.get("full_name") or instructor_id
+        instructor_avatar = user.get("user_image") or ""
 
     return {
         "id": instructor_id,
@@ -58,121 +302,179 @@ def get_course_instructor(course_doc):
 
 def get_course_stats(course_name):
     """Get course statistics like enrollments, lessons count"""
+    return get_course_stats_bulk([course_name])[course_name]
+
+
+def get_course_stats_bulk(course_names):
+    """Get enrollment and lesson counts for many courses using grouped queries
+
+    Returns:
+        {course_name: {"students": int, "lessons": int}}
+    """
+    stats = {name: {"students": 0, "lessons": 0} for name in course_names}
+    if not course_names:
+        return stats
+
+    values = {"names": tuple(course_names)}
+
     # Count enrolled students
-    student_count = frappe.db.count(
-        "LMS Enrollment",
-        filters={"course": course_name}
-    ) or 0
-
-    # Count lessons/chapters
-    lesson_count = 0
-    if frappe.db.exists("DocType", "Course Chapter"):
-        chapters = frappe.get_all(
-            "Course Chapter",
-            filters={"course": course_name},
-            fields=["name"]
-        )
-        for chapter in chapters:
-            lessons = frappe.db.count(
-                "Course Lesson",
-                filters={"chapter": chapter.name}
-            ) or 0
-            lesson_count += lessons
+    for course, student_count in frappe.db.sql(
+        """
+        SELECT course, COUNT(*)
+        FROM `tabLMS Enrollment`
+        WHERE course IN %(names)s
+        GROUP BY course
+        """,
+        values
+    ):
+        stats[course]["students"] = student_count
+
+    # Count lessons through their chapters
+    has_lessons = _has_dt("Course Lesson")
+    if has_lessons and _has_dt("Course Chapter"):
+        for course, lesson_count in frappe.db.sql(
+            """
+            SELECT ch.course, COUNT(l.name)
+            FROM `tabCourse Chapter` ch
+            INNER JOIN `tabCourse Lesson` l ON l.chapter = ch.name
+            WHERE ch.course IN %(names)s
+            GROUP BY ch.course
+            """,
+            values
+        ):
+            stats[course]["lessons"] = lesson_count
 
     # If no chapters, try direct lessons count
-    if lesson_count == 0 and frappe.db.exists("DocType", "Course Lesson"):
-        lesson_count = frappe.db.count(
-            "Course Lesson",
-            filters={"course": course_name}
-        ) or 0
-
-    return {
-        "students": student_count,
-        "lessons": lesson_count
-    }
+    without_lessons = tuple(name for name, counts in stats.items() if not counts["lessons"])
+    if has_lessons and without_lessons:
+        for course, lesson_count in frappe.db.sql(
+            """
+            SELECT course, COUNT(*)
+            FROM `tabCourse Lesson`
+            WHERE course IN %(names)s
+            GROUP BY course
+            """,
+            {"names": without_lessons}
+        ):
+            stats[course]["lessons"] = lesson_count
+
+    return stats
 
 
 def get_course_rating(course_name):
     """Get average course rating and review count"""
-    rating = 0
-    review_count = 0
+    return get_course_ratings_bulk([course_name])[course_name]
+
+
+def get_course_ratings_bulk(course_names):
+    """
+    Get average rating and review count for many courses with one aggregate query
+
+    Returns:
+        {course_name: {"rating": float, "reviewCount": int}}
+    """
+    ratings = {name: {"rating": 0, "reviewCount": 0} for name in course_names}
 
     # Check if course review doctype exists
-    if frappe.db.exists("DocType", "LMS Course Review"):
-        reviews = frappe.get_all(
-            "LMS Course Review",
-            filters={"course": course_name},
-            fields=["rating"]
-        )
-        if reviews:
-            review_count = len(reviews)
-            total_rating = sum([r.rating for r in reviews])
-            rating = round(total_rating / review_count, 1)
+    if not course_names or not _has_dt("LMS Course Review"):
+        return ratings
+
+    for course, review_count, average_rating in frappe.db.sql(
+        """
+        SELECT course, COUNT(*), AVG(rating)
+        FROM `tabLMS Course Review`
+        WHERE course IN %(names)s
+        GROUP BY course
+        """,
+        {"names": tuple(course_names)}
+    ):
+        ratings[course] = {
+            "rating": round(flt(average_rating), 1),
+            "reviewCount": review_count
+        }
 
-    return {
-        "rating": rating,
-        "reviewCount": review_count
-    }
+    return ratings
+
+
+def course_slug(course_name):
+    """URL slug of a course: its name lowercased, with spaces as hyphens"""
+    return course_name.lower().replace(" ", "-")
 
 
-def format_course_for_frontend(course_doc):
-    """Format a course document for the React frontend"""
-    course_name = course_doc.name if hasattr(course_doc, 'name') else course_doc.get('name')
+def format_course_for_frontend(
+    course_doc, fields=None, stats_map=None, rating_map=None, instructor_map=None, lite=False
+):
+    """
+    Format a course document for the React frontend
+
+    Args:
+        course_doc: Course row dict (or Document) exposing .get()
+        fields: Optional set of field names present on course_doc; pass it when
+            formatting many rows of the same shape so it is computed only once
+        stats_map: Optional {course_name: stats} prefetched with get_course_stats_bulk
+        rating_map: Optional {course_name: rating} prefetched with get_course_ratings_bulk
+        instructor_map: Optional {user_id: user} prefetched with get_instructors_bulk
+        lite: Skip the enrollment, lesson and rating aggregates and report them as 0;
+            the frontend can lazy-load them with get_courses_stats
+    """
+    if fields is None:
+        fields = set(course_doc.keys()) if isinstance(course_doc, dict) else set(vars(course_doc))
+
+    course_name = course_doc.get('name')
 
     # Get stats
-    stats = get_course_stats(course_name)
-    rating_info = get_course_rating(course_name)
-
-    # Get price info
-    price = 0
-    original_price = 0
-    is_free = True
-
-    if hasattr(course_doc, 'paid'):
-        is_free = not course_doc.paid
-    if hasattr(course_doc, 'course_price'):
-        price = flt(course_doc.course_price) or 0
-        is_free = price == 0
-    if hasattr(course_doc, 'price'):
-        price = flt(course_doc.price) or 0
+    if lite:
+        stats = {"students": 0, "lessons": 0}
+        rating_info = {"rating": 0, "reviewCount": 0}
+    else:
+        stats = (stats_map or {}).get(course_name) or get_course_stats(course_name)
+        rating_info = (rating_map or {}).get(course_name) or get_course_rating(course_name)
+
+    # Get price info; a price column takes precedence over course_price and the paid flag
+    price_field = 'price' if 'price' in fields else ('course_price' if 'course_price' in fields else None)
+    if price_field:
+        price = flt(course_doc.get(price_field)) or 0
         is_free = price == 0
+    else:
+        price = 0
+        is_free = not course_doc.get('paid') if 'paid' in fields else True
 
     original_price = price  # Can be modified if discount field exists
 
     # Get category
     category = ""
-    if hasattr(course_doc, 'category') and course_doc.category:
-        category = course_doc.category
+    if 'category' in fields and course_doc.get('category'):
+        category = course_doc.get('category')
 
     # Get level/difficulty
     level = "Basic"
-    if hasattr(course_doc, 'level') and course_doc.level:
-        level = course_doc.level
-    elif hasattr(course_doc, 'difficulty') and course_doc.difficulty:
-        level = course_doc.difficulty
+    if 'level' in fields and course_doc.get('level'):
+        level = course_doc.get('level')
+    elif 'difficulty' in fields and course_doc.get('difficulty'):
+        level = course_doc.get('difficulty')
 
     # Get duration
     duration = ""
-    if hasattr(course_doc, 'video_link'):
+    if 'video_link' in fields:
         duration = "Self-paced"
-    if hasattr(course_doc, 'duration') and course_doc.duration:
-        duration = course_doc.duration
+    if 'duration' in fields and course_doc.get('duration'):
+        duration = course_doc.get('duration')
 
     # Check if featured
     is_featured = False
-    if hasattr(course_doc, 'featured'):
-        is_featured = bool(course_doc.featured)
-    if hasattr(course_doc, 'is_featured'):
-        is_featured = bool(course_doc.is_featured)
+    if 'featured' in fields:
+        is_featured = bool(course_doc.get('featured'))
+    if 'is_featured' in fields:
+        is_featured = bool(course_doc.get('is_featured'))
 
     # Get instructor info
-    instructor = get_course_instructor(course_doc)
+    instructor = get_course_instructor(course_doc, instructor_map=instructor_map)
 
     return {
         "id": course_name,
-        "title": course_doc.title if hasattr(course_doc, 'title') else course_name,
-        "slug": course_doc.name.lower().replace(" ", "-"),
-        "description": course_doc.short_introduction if hasattr(course_doc, 'short_introduction') else (course_doc.description if hasattr(course_doc, 'description') else ""),
+        "title": course_doc.get('title') if 'title' in fields else course_name,
+        "slug": course_slug(course_doc.get('name')),
+        "description": course_doc.get('short_introduction') if 'short_introduction' in fields else (course_doc.get('description') if 'description' in fields else ""),
         "image": get_course_image(course_doc),
         "instructor": instructor,
         "category": category,
@@ -186,12 +488,162 @@ def format_course_for_frontend(course_doc):
         "students": stats["students"],
         "isFree": is_free,
         "isFeatured": is_featured,
-        "createdAt": str(course_doc.creation) if hasattr(course_doc, 'creation') else "",
-        "published": course_doc.published if hasattr(course_doc, 'published') else True
+        "createdAt": str(course_doc.get('creation')) if 'creation' in fields else "",
+        "published": course_doc.get('published') if 'published' in fields else True
     }
 
 
+def get_cached_course_cards(courses):
+    """
+    Read formatted cards for course rows from the course card cache in one round-trip
+
+    A cached card is only returned while its course's modified timestamp still
+    matches the row, so edits to the course itself never serve a stale card.
+
+    Returns:
+        {course_name: card} for the rows that had a fresh cached card
+    """
+    if not courses:
+        return {}
+
+    cache = frappe.cache()
+    names = [course.name for course in courses]
+    cached = cache.hmget(cache.make_key(COURSE_CARD_CACHE_KEY), names)
+
+    cards = {}
+    for course, value in zip(courses, cached):
+        if value is None:
+            continue
+        modified, card = pickle.loads(value)
+        if modified == course.get("modified"):
+            cards[course.name] = card
+    return cards
+
+
+def set_cached_course_cards(entries):
+    """
+    Store formatted cards in the course card cache in one round-trip
+
+    Args:
+        entries: Iterable of (course_row, card) pairs
+    """
+    cache = frappe.cache()
+    key = cache.make_key(COURSE_CARD_CACHE_KEY)
+    pipe = cache.pipeline()
+    for course, card in entries:
+        pipe.hset(key, course.name, pickle.dumps((course.get("modified"), card)))
+    pipe.expire(key, COURSE_CARD_CACHE_TTL)
+    pipe.execute()
+
+
+def _course_of(doc):
+    """The LMS Course a course, chapter, lesson, enrollment or review belongs to"""
+    if doc.doctype == "LMS Course":
+        return doc.name
+    if doc.get("course"):
+        return doc.course
+    if doc.doctype == "Course Lesson" and doc.get("chapter"):
+        return frappe.db.get_value("Course Chapter", doc.chapter, "course")
+    return None
+
+
+def clear_course_card_cache(doc, method=None):
+    """doc_events hook: drop the cached card of the course a document belongs to"""
+    docs = [doc]
+    # A document moved to another course (e.g. an enrollment) also changes the previous card
+    if method == "on_update" and doc.get_doc_before_save():
+        docs.append(doc.get_doc_before_save())
+
+    for course in {course for course in map(_course_of, docs) if course}:
+        frappe.cache().hdel(COURSE_CARD_CACHE_KEY, course)
+
+
+def clear_course_lesson_count(doc, method=None):
+    """doc_events hook: drop the cached lesson count of a chapter's or lesson's course"""
+    docs = [doc]
+    # A chapter or lesson moved elsewhere also changes its previous course's count
+    if method == "on_update" and doc.get_doc_before_save():
+        docs.append(doc.get_doc_before_save())
+
+    keys = {f"total_lessons:{course}" for course in map(_course_of, docs) if course}
+    if keys:
+        frappe.cache().delete_value(list(keys))
+
+
+def clear_instructor_caches(doc, method=None):
+    """doc_events hook: course cards and the instructor list embed user names and images"""
+    if method == "on_trash" or doc.has_value_changed("full_name") or doc.has_value_changed("user_image"):
+        frappe.cache().delete_value([COURSE_CARD_CACHE_KEY, INSTRUCTORS_CACHE_KEY])
+        invalidate_featured_courses_cache(doc, method)
+
+
+def invalidate_categories_cache(doc, method=None):
+    """doc_events hook: drop the cached category list"""
+    frappe.cache().delete_value(CATEGORIES_CACHE_KEY)
+
+
+def invalidate_instructors_cache(doc, method=None):
+    """doc_events hook: drop the cached instructor list"""
+    frappe.cache().delete_value(INSTRUCTORS_CACHE_KEY)
+
+
+def invalidate_featured_courses_cache(doc, method=None):
+    """doc_events hook: drop the cached featured course lists for every limit"""
+    frappe.cache().delete_keys(FEATURED_COURSES_CACHE_PREFIX)
+
+
+def get_course_names_by_aggregate(sort_by, filters, or_filters, start, page_length):
+    """
+    Names of one page of matching courses ranked by enrollments ('popular') or rating
+
+    Ranking happens in SQL over the filtered courses, so only the page is returned;
+    ties keep the newest course first.
+    """
+    matching = frappe.get_all(
+        "LMS Course",
+        filters=filters,
+        or_filters=or_filters,
+        fields=["name", "creation"],
+        run=0
+    )
+
+    if sort_by == "popular" and _has_dt("LMS Enrollment"):
+        aggregate = """
+            SELECT course, COUNT(*) AS score
+            FROM `tabLMS Enrollment`
+            GROUP BY course
+        """
+    elif sort_by == "rating" and _has_dt("LMS Course Review"):
+        aggregate = """
+            SELECT course, ROUND(AVG(rating), 1) AS score
+            FROM `tabLMS Course Review`
+            GROUP BY course
+        """
+    else:
+        aggregate = "SELECT NULL AS course, 0 AS score"
+
+    # The subquery is already rendered with its values (including LIKE '%...%'
+    # patterns), so this query is run without parameters
+    return frappe.db.sql_list(
+        f"""
+        SELECT c.name
+        FROM ({matching}) c
+        LEFT JOIN ({aggregate}) a ON a.course = c.name
+        ORDER BY COALESCE(a.score, 0) DESC, c.creation DESC
+        LIMIT {cint(page_length)} OFFSET {cint(start)}
+        """
+    )
+
+
 @frappe.whitelist(allow_guest=True)
+@json_body(aliases={
+    "priceType": "price_type",
+    "minPrice": "min_price",
+    "maxPrice": "max_price",
+    "sortBy": "sort_by",
+    "pageSize": "page_size",
+    "accurateCount": "accurate_count"
+})
 def get_courses(
     category=None,
     level=None,
@@ -203,7 +655,9 @@ def get_courses(
     search=None,
     sort_by=None,
     page=1,
-    page_size=10
+    page_size=10,
+    accurate_count=False,
+    lite=False
 ):
     """
     Get list of courses with filtering and pagination
@@ -220,42 +674,31 @@ def get_courses(
         sort_by: Sort option ('newest', 'popular', 'rating', 'price_low', 'price_high')
         page: Page number (default: 1)
         page_size: Items per page (default: 10)
+        accurate_count: Count every match instead of stopping at COURSE_COUNT_LIMIT
+        lite: Leave out student, lesson and rating aggregates for courses that are not
+            already cached
+
+        Each argument may also come from a JSON body, using camelCase keys
+        (priceType, minPrice, maxPrice, sortBy, pageSize, accurateCount)
 
     Returns:
         {
             "success": bool,
             "courses": Array of course objects,
-            "totalCount": Total matching courses,
+            "totalCount": Total matching courses (at most COURSE_COUNT_LIMIT unless accurate_count),
+            "totalCountCapped": Whether totalCount stopped at the cap,
             "pageSize": Items per page,
             "currentPage": Current page number,
             "totalPages": Total pages
         }
     """
     try:
-        # Parse JSON if data comes as request body
-        if frappe.request.data:
-            try:
-                data = json.loads(frappe.request.data)
-                category = data.get("category", category)
-                level = data.get("level", level)
-                instructor = data.get("instructor", instructor)
-                price_type = data.get("priceType", price_type)
-                min_price = data.get("minPrice", min_price)
-                max_price = data.get("maxPrice", max_price)
-                rating = data.get("rating", rating)
-                search = data.get("search", search)
-                sort_by = data.get("sortBy", sort_by)
-                page = data.get("page", page)
-                page_size = data.get("pageSize", page_size)
-            except json.JSONDecodeError:
-                pass
-
         # Parse URL parameters
         page = cint(page) or 1
         page_size = cint(page_size) or 10
 
         # Check if LMS Course doctype exists
-        if not frappe.db.exists("DocType", "LMS Course"):
+        if not _has_dt("LMS Course"):
             return {
                 "success": False,
                 "message": _("LMS Course doctype not found. Please ensure Frappe LMS is installed.")
@@ -265,20 +708,20 @@ def get_courses(
         filters = {}
 
         # Only show published courses
-        if frappe.db.has_column("LMS Course", "published"):
+        if _has_col("LMS Course", "published"):
             filters["published"] = 1
 
         # Category filter
         if category:
-            if frappe.db.has_column("LMS Course", "category"):
+            if _has_col("LMS Course", "category"):
                 filters["category"] = category
 
         # Level filter
         if level:
             level_field = None
-            if frappe.db.has_column("LMS Course", "level"):
+            if _has_col("LMS Course", "level"):
                 level_field = "level"
-            elif frappe.db.has_column("LMS Course", "difficulty"):
+            elif _has_col("LMS Course", "difficulty"):
                 level_field = "difficulty"
 
             if level_field:
@@ -287,15 +730,15 @@ def get_courses(
         # Price type filter
         if price_type:
             if price_type == "free":
-                if frappe.db.has_column("LMS Course", "paid"):
+                if _has_col("LMS Course", "paid"):
                     filters["paid"] = 0
             elif price_type == "paid":
-                if frappe.db.has_column("LMS Course", "paid"):
+                if _has_col("LMS Course", "paid"):
                     filters["paid"] = 1
 
         # Instructor filter
         if instructor:
-            if frappe.db.has_column("LMS Course", "instructor"):
+            if _has_col("LMS Course", "instructor"):
                 filters["instructor"] = ["like", f"%{instructor}%"]
             else:
                 filters["owner"] = ["like", f"%{instructor}%"]
@@ -305,86 +748,140 @@ def get_courses(
         if sort_by == "newest":
             order_by = "creation desc"
         elif sort_by == "popular":
-            order_by = "creation desc"  # Will sort by enrollment count later
+            order_by = "creation desc"  # Ranked by enrollment count in get_course_names_by_aggregate
         elif sort_by == "rating":
-            order_by = "creation desc"  # Will sort by rating later
+            order_by = "creation desc"  # Ranked by rating in get_course_names_by_aggregate
         elif sort_by == "price_low":
-            if frappe.db.has_column("LMS Course", "course_price"):
+            if _has_col("LMS Course", "course_price"):
                 order_by = "course_price asc"
         elif sort_by == "price_high":
-            if frappe.db.has_column("LMS Course", "course_price"):
+            if _has_col("LMS Course", "course_price"):
                 order_by = "course_price desc"
 
-        # Get all courses with filters
-        all_courses = frappe.get_all(
+        # Price range filter
+        if min_price is not None or max_price is not None:
+            price_field = None
+            if _has_col("LMS Course", "course_price"):
+                price_field = "course_price"
+            elif _has_col("LMS Course", "price"):
+                price_field = "price"
+
+            if price_field:
+                min_p = flt(min_price) if min_price else 0
+                if max_price:
+                    filters[price_field] = ["between", [min_p, flt(max_price)]]
+                else:
+                    filters[price_field] = [">=", min_p]
+
+        # Rating filter: only courses whose average review rating is high enough
+        if rating and flt(rating) > 0:
+            rated_courses = []
+            if _has_dt("LMS Course Review"):
+                rated_courses = frappe.db.sql_list(
+                    """
+                    SELECT course
+                    FROM `tabLMS Course Review`
+                    GROUP BY course
+                    HAVING ROUND(AVG(rating), 1) >= %s
+                    """,
+                    flt(rating)
+                )
+            filters["name"] = ["in", rated_courses]
+
+        # Search in title, introduction and owner
+        or_filters = []
+        if search:
+            matched_names = search_course_names(search)
+            if matched_names is not None:
+                or_filters = [["name", "in", matched_names], ["owner", "like", f"%{search}%"]]
+            else:
+                search_fields = ["title", "owner"]
+                if _has_col("LMS Course", "short_introduction"):
+                    search_fields.append("short_introduction")
+                or_filters = [[field, "like", f"%{search}%"] for field in search_fields]
+
+        # Every sort, including the popularity and rating aggregates, paginates in SQL
+        start_idx = (page - 1) * page_size
+
+        total_count, count_capped = _safe_count(
             "LMS Course",
             filters=filters,
-            fields=["*"],
-            order_by=order_by
+            or_filters=or_filters,
+            limit=None if cint(accurate_count) else COURSE_COUNT_LIMIT
         )
 
-        # Apply search filter
-        if search:
-            search_lower = search.lower()
-            filtered_courses = []
-            for course in all_courses:
-                title = (course.title or "").lower()
-                description = (course.short_introduction or course.description or "").lower()
-                owner = (course.owner or "").lower()
-
-                if search_lower in title or search_lower in description or search_lower in owner:
-                    filtered_courses.append(course)
-            all_courses = filtered_courses
-
-        # Apply price range filter
-        if min_price is not None or max_price is not None:
-            min_p = flt(min_price) if min_price else 0
-            max_p = flt(max_price) if max_price else float('inf')
+        course_fields = get_course_list_fields()
+        if sort_by in ("popular", "rating"):
+            page_names = get_course_names_by_aggregate(
+                sort_by, filters, or_filters, start_idx, page_size
+            )
+            rows = frappe.get_all(
+                "LMS Course",
+                filters={"name": ["in", page_names]},
+                fields=course_fields
+            ) if page_names else []
+            rows_by_name = {row.name: row for row in rows}
+            courses = [rows_by_name[name] for name in page_names if name in rows_by_name]
+        else:
+            courses = frappe.get_all(
+                "LMS Course",
+                filters=filters,
+                or_filters=or_filters,
+                fields=course_fields,
+                order_by=order_by,
+                start=start_idx,
+                page_length=page_size
+            )
 
-            filtered_courses = []
-            for course in all_courses:
-                price = flt(course.get("course_price") or course.get("price") or 0)
-                if min_p <= price <= max_p:
-                    filtered_courses.append(course)
-            all_courses = filtered_courses
+        # Every row has the same projected columns
+        fields = set(course_fields)
 
-        # Format courses for frontend
-        formatted_courses = []
-        for course in all_courses:
-            # Create a simple namespace object for compatibility
-            class CourseDoc:
-                pass
-            course_obj = CourseDoc()
-            for key, value in course.items():
-                setattr(course_obj, key, value)
-
-            formatted = format_course_for_frontend(course_obj)
-            formatted_courses.append(formatted)
+        # Serve cached cards first; only the misses need formatting
+        cached_cards = get_cached_course_cards(courses)
+        uncached = [course for course in courses if course.name not in cached_cards]
 
-        # Apply rating filter
-        if rating:
-            min_rating = flt(rating)
-            formatted_courses = [c for c in formatted_courses if c["rating"] >= min_rating]
+        if uncached and cint(lite):
+            # Lite cards lack the aggregates, so they are not written to the card cache
+            instructor_map = get_instructors_bulk(
+                {course.get("instructor") or course.owner for course in uncached}
+            )
+            for course in uncached:
+                cached_cards[course.name] = format_course_for_frontend(
+                    course, fields=fields, instructor_map=instructor_map, lite=True
+                )
+        elif uncached:
+            # Prefetch counts, ratings and instructors for the uncached courses at once
+            course_names = [course.name for course in uncached]
+            stats_map = get_course_stats_bulk(course_names)
+            rating_map = get_course_ratings_bulk(course_names)
+            instructor_map = get_instructors_bulk(
+                {course.get("instructor") or course.owner for course in uncached}
+            )
 
-        # Sort by popularity (student count) or rating if requested
-        if sort_by == "popular":
-            formatted_courses.sort(key=lambda x: x["students"], reverse=True)
-        elif sort_by == "rating":
-            formatted_courses.sort(key=lambda x: x["rating"], reverse=True)
+            new_cards = []
+            for course in uncached:
+                formatted = format_course_for_frontend(
+                    course,
+                    fields=fields,
+                    stats_map=stats_map,
+                    rating_map=rating_map,
+                    instructor_map=instructor_map
+                )
+                cached_cards[course.name] = formatted
+                new_cards.append((course, formatted))
+            set_cached_course_cards(new_cards)
+
+        # Format courses for frontend
+        formatted_courses = [cached_cards[course.name] for course in courses]
 
         # Calculate pagination
-        total_count = len(formatted_courses)
         total_pages = (total_count + page_size - 1) // page_size if page_size > 0 else 1
 
-        # Apply pagination
-        start_idx = (page - 1) * page_size
-        end_idx = start_idx + page_size
-        paginated_courses = formatted_courses[start_idx:end_idx]
-
         return {
             "success": True,
-            "courses": paginated_courses,
+            "courses": formatted_courses,
             "totalCount": total_count,
+            "totalCountCapped": count_capped,
             "pageSize": page_size,
             "currentPage": page,
             "totalPages": total_pages
@@ -429,28 +926,61 @@ def get_course(course_id=None, slug=None):
 
         # If slug provided, find by slug (name in Frappe)
         if slug and not course_id:
-            # Try to find course by name that matches slug pattern
-            courses = frappe.get_all(
-                "LMS Course",
-                filters={},
-                fields=["name"]
+            # Probe the primary key with the slug and its de-hyphenated form, and only
+            # scan the names when neither matches (names mixing hyphens and spaces).
+            # The collation may ignore case, so every hit is confirmed against
+            # course_slug(); a name equal to the slug wins over its spaced twin.
+            slug = slug.lower()
+            candidates = [slug, slug.replace("-", " ")]
+            matches = sorted(
+                (
+                    name for name in frappe.db.sql_list(
+                        """
+                        SELECT name
+                        FROM `tabLMS Course`
+                        WHERE name IN %(candidates)s
+                        """,
+                        {"candidates": candidates}
+                    )
+                    if course_slug(name) == slug
+                ),
+                key=lambda name: name.lower() != slug
+            ) or [
+                name for name in frappe.db.sql_list(
+                    """
+                    SELECT name
+                    FROM `tabLMS Course`
+                    WHERE LOWER(REPLACE(name, ' ', '-')) = %s
+                    ORDER BY creation
+                    """,
+                    slug
+                )
+                if course_slug(name) == slug
+            ]
+            if matches:
+                course_name = matches[0]
+
+        # Only the columns the formatter reads; child tables are never needed here
+        course_doc = None
+        if course_name:
+            course_doc = frappe.db.get_value(
+                "LMS Course", course_name, get_course_list_fields(), as_dict=True
             )
-            for c in courses:
-                if c.name.lower().replace(" ", "-") == slug.lower():
-                    course_name = c.name
-                    break
 
-        if not course_name or not frappe.db.exists("LMS Course", course_name):
+        if not course_doc:
             return {
                 "success": False,
                 "message": _("Course not found")
             }
 
-        course_doc = frappe.get_doc("LMS Course", course_name)
-        formatted_course = format_course_for_frontend(course_doc)
+        # The listing's card cache holds the same card as this view's base
+        formatted_course = get_cached_course_cards([course_doc]).get(course_doc.name)
+        if not formatted_course:
+            formatted_course = format_course_for_frontend(course_doc)
+            set_cached_course_cards([(course_doc, formatted_course)])
 
         # Add additional details for single course view
-        formatted_course["fullDescription"] = course_doc.description if hasattr(course_doc, 'description') else ""
+        formatted_course["fullDescription"] = course_doc.get("description") or ""
 
         return {
             "success": True,
@@ -465,6 +995,57 @@ def get_course(course_id=None, slug=None):
         }
 
 
+@frappe.whitelist(allow_guest=True)
+def get_courses_stats(course_ids=None):
+    """
+    Get student, lesson and rating aggregates for courses shown as lite cards
+
+    Args:
+        course_ids: List (or JSON list) of course names, at most 100
+
+    Returns:
+        {
+            "success": bool,
+            "stats": {course_id: {"students", "lessons", "rating", "reviewCount"}}
+        }
+    """
+    try:
+        if isinstance(course_ids, str):
+            try:
+                course_ids = json_loads(course_ids)
+            except json.JSONDecodeError:
+                course_ids = [course_ids]
+
+        course_ids = course_ids or []
+        if not isinstance(course_ids, list) or not all(isinstance(name, str) for name in course_ids):
+            return {
+                "success": False,
+                "stats": {},
+                "message": _("course_ids must be a list of course IDs")
+            }
+
+        course_ids = list(dict.fromkeys(course_ids))[:100]
+
+        stats_map = get_course_stats_bulk(course_ids)
+        rating_map = get_course_ratings_bulk(course_ids)
+
+        return {
+            "success": True,
+            "stats": {
+                name: {**stats_map[name], **rating_map[name]}
+                for name in course_ids
+            }
+        }
+
+    except Exception as e:
+        frappe.log_error(f"Get courses stats error: {str(e)}", "Course API")
+        return {
+            "success": False,
+            "stats": {},
+            "message": _("An error occurred while fetching course stats")
+        }
+
+
 @frappe.whitelist(allow_guest=True)
 def get_featured_courses(limit=6):
     """
@@ -482,20 +1063,29 @@ def get_featured_courses(limit=6):
     try:
         limit = cint(limit) or 6
 
+        cache_key = f"{FEATURED_COURSES_CACHE_PREFIX}{limit}"
+        cached = frappe.cache().get_value(cache_key)
+        if cached is not None:
+            return {
+                "success": True,
+                "courses": cached
+            }
+
         # Check for featured field
         filters = {}
-        if frappe.db.has_column("LMS Course", "featured"):
+        if _has_col("LMS Course", "featured"):
             filters["featured"] = 1
-        elif frappe.db.has_column("LMS Course", "is_featured"):
+        elif _has_col("LMS Course", "is_featured"):
             filters["is_featured"] = 1
 
-        if frappe.db.has_column("LMS Course", "published"):
+        if _has_col("LMS Course", "published"):
             filters["published"] = 1
 
+        course_fields = get_course_list_fields()
         courses = frappe.get_all(
             "LMS Course",
             filters=filters,
-            fields=["*"],
+            fields=course_fields,
             limit=limit,
             order_by="creation desc"
         )
@@ -503,28 +1093,33 @@ def get_featured_courses(limit=6):
         # If no featured courses found, return newest courses
         if not courses:
             filters = {}
-            if frappe.db.has_column("LMS Course", "published"):
+            if _has_col("LMS Course", "published"):
                 filters["published"] = 1
 
             courses = frappe.get_all(
                 "LMS Course",
                 filters=filters,
-                fields=["*"],
+                fields=course_fields,
                 limit=limit,
                 order_by="creation desc"
             )
 
+        instructor_map = get_instructors_bulk(
+            {course.get("instructor") or course.owner for course in courses}
+        )
+        fields = set(course_fields)
+
         formatted_courses = []
         for course in courses:
-            class CourseDoc:
-                pass
-            course_obj = CourseDoc()
-            for key, value in course.items():
-                setattr(course_obj, key, value)
-
-            formatted = format_course_for_frontend(course_obj)
+            formatted = format_course_for_frontend(
+                course, fields=fields, instructor_map=instructor_map, lite=True
+            )
             formatted_courses.append(formatted)
 
+        frappe.cache().set_value(
+            cache_key, formatted_courses, expires_in_sec=FEATURED_COURSES_CACHE_TTL
+        )
+
         return {
             "success": True,
             "courses": formatted_courses
@@ -547,34 +1142,65 @@ def get_categories():
     Returns:
         {
             "success": bool,
-            "categories": Array of category names
+            "categories": Array of category names,
+            "categoryCounts": Array of {"name", "count"} with published course counts
         }
     """
     try:
+        cached = frappe.cache().get_value(CATEGORIES_CACHE_KEY)
+        if cached is not None:
+            return {
+                "success": True,
+                **cached
+            }
+
         categories = []
+        category_counts = []
+
+        # Published courses per category value, most popular first
+        course_counts = []
+        if _has_col("LMS Course", "category"):
+            published_condition = "AND published = 1" if _has_col("LMS Course", "published") else ""
+            course_counts = frappe.db.sql(
+                f"""
+                SELECT category AS name, COUNT(*) AS count
+                FROM `tabLMS Course`
+                WHERE category IS NOT NULL AND category != '' {published_condition}
+                GROUP BY category
+                ORDER BY count DESC
+                """,
+                as_dict=True
+            )
 
         # Check if LMS Category doctype exists
-        if frappe.db.exists("DocType", "LMS Category"):
+        if _has_dt("LMS Category"):
+            counts_by_category = {row.name: row.count for row in course_counts}
             cat_docs = frappe.get_all(
                 "LMS Category",
                 fields=["name", "category_name", "title"],
                 order_by="name"
             )
             for cat in cat_docs:
-                categories.append(cat.category_name or cat.title or cat.name)
+                category_name = cat.category_name or cat.title or cat.name
+                categories.append(category_name)
+                category_counts.append({
+                    "name": category_name,
+                    "count": counts_by_category.get(cat.name, 0)
+                })
         else:
             # Get unique categories from courses
-            if frappe.db.has_column("LMS Course", "category"):
-                course_categories = frappe.get_all(
-                    "LMS Course",
-                    fields=["category"],
-                    distinct=True
-                )
-                categories = list(set([c.category for c in course_categories if c.category]))
+            categories = [row.name for row in course_counts]
+            category_counts = [{"name": row.name, "count": row.count} for row in course_counts]
+
+        payload = {
+            "categories": categories,
+            "categoryCounts": category_counts
+        }
+        frappe.cache().set_value(CATEGORIES_CACHE_KEY, payload, expires_in_sec=LOOKUP_CACHE_TTL)
 
         return {
             "success": True,
-            "categories": categories
+            **payload
         }
 
     except Exception as e:
@@ -598,29 +1224,38 @@ def get_instructors():
         }
     """
     try:
-        # Get unique course owners/instructors
-        courses = frappe.get_all(
-            "LMS Course",
-            fields=["owner", "instructor"] if frappe.db.has_column("LMS Course", "instructor") else ["owner"],
-            distinct=True
+        instructors = frappe.cache().get_value(INSTRUCTORS_CACHE_KEY)
+        if instructors is not None:
+            return {
+                "success": True,
+                "instructors": instructors
+            }
+
+        # Distinct instructors (falling back to the owner) of published courses, in one query
+        instructor_column = "COALESCE(NULLIF(c.instructor, ''), c.owner)" if _has_col("LMS Course", "instructor") else "c.owner"
+        published_condition = "WHERE c.published = 1" if _has_col("LMS Course", "published") else ""
+
+        users = frappe.db.sql(
+            f"""
+            SELECT DISTINCT u.name, u.full_name, u.user_image
+            FROM `tabLMS Course` c
+            JOIN `tabUser` u ON u.name = {instructor_column}
+            {published_condition}
+            ORDER BY u.full_name
+            """,
+            as_dict=True
         )
 
-        instructor_ids = set()
-        for course in courses:
-            if hasattr(course, 'instructor') and course.instructor:
-                instructor_ids.add(course.instructor)
-            else:
-                instructor_ids.add(course.owner)
+        instructors = [
+            {
+                "id": user.name,
+                "name": user.full_name or user.name,
+                "avatar": user.user_image or ""
+            }
+            for user in users
+        ]
 
-        instructors = []
-        for instructor_id in instructor_ids:
-            if instructor_id and frappe.db.exists("User", instructor_id):
-                user = frappe.get_doc("User", instructor_id)
-                instructors.append({
-                    "id": instructor_id,
-                    "name": user.full_name or instructor_id,
-                    "avatar": user.user_image or ""
-                })
+        frappe.cache().set_value(INSTRUCTORS_CACHE_KEY, instructors, expires_in_sec=LOOKUP_CACHE_TTL)
 
         return {
             "success": True,
@@ -666,7 +1301,7 @@ def get_course_curriculum(course_id):
         curriculum = []
 
         # Get chapters
-        if frappe.db.exists("DocType", "Course Chapter"):
+        if _has_dt("Course Chapter"):
             chapters = frappe.get_all(
                 "Course Chapter",
                 filters={"course": course_id},
@@ -674,32 +1309,31 @@ def get_course_curriculum(course_id):
                 order_by="idx"
             )
 
-            for chapter in chapters:
-                lessons = []
-
-                # Get lessons for this chapter
-                if frappe.db.exists("DocType", "Course Lesson"):
-                    lesson_docs = frappe.get_all(
-                        "Course Lesson",
-                        filters={"chapter": chapter.name},
-                        fields=["name", "title", "include_in_preview", "idx"],
-                        order_by="idx"
-                    )
+            # Get lessons for all chapters at once and group them by chapter
+            lessons_by_chapter = defaultdict(list)
+            if chapters and _has_dt("Course Lesson"):
+                lesson_docs = frappe.get_all(
+                    "Course Lesson",
+                    filters={"chapter": ["in", [chapter.name for chapter in chapters]]},
+                    fields=["name", "title", "include_in_preview", "idx", "chapter"],
+                    order_by="idx"
+                )
 
-                    for lesson in lesson_docs:
-                        lessons.append({
-                            "id": lesson.name,
-                            "title": lesson.title,
-                            "isPreview": bool(lesson.include_in_preview) if hasattr(lesson, 'include_in_preview') else False,
-                            "order": lesson.idx
-                        })
+                for lesson in lesson_docs:
+                    lessons_by_chapter[lesson.chapter].append({
+                        "id": lesson.name,
+                        "title": lesson.title,
+                        "isPreview": bool(lesson.include_in_preview),
+                        "order": lesson.idx
+                    })
 
+            for chapter in chapters:
                 curriculum.append({
                     "id": chapter.name,
                     "title": chapter.title,
                     "description": chapter.description or "",
                     "order": chapter.idx,
-                    "lessons": lessons
+                    "lessons": lessons_by_chapter[chapter.name]
                 })
 
         return {
@@ -718,7 +1352,153 @@ def get_course_curriculum(course_id):
 
 # ==================== COURSE CREATION API ====================
 
+def _curriculum_value_error(doctype, fieldname, value):
+    """Why `value` cannot be stored in a curriculum column, or None when it can"""
+    df = frappe.get_meta(doctype).get_field(fieldname)
+    if not df or value in (None, ""):
+        return None
+    if df.fieldtype == "Data" and len(str(value)) > (df.length or 140):
+        return _("{0} {1} is longer than {2} characters").format(
+            _(doctype), _(df.label or fieldname), df.length or 140
+        )
+    return None
+
+
+def validate_course_curriculum(chapters):
+    """
+    Check a create_course curriculum before it is bulk inserted
+
+    insert_course_curriculum skips Document.insert(), so the permission and field
+    checks it would have run happen here instead.
+
+    Returns:
+        An error message, or None when the curriculum can be inserted
+    """
+    if not all(isinstance(chapter, dict) for chapter in chapters):
+        return _("Each chapter must be an object")
+
+    has_lessons = _has_dt("Course Lesson") and any(chapter.get("lessons") for chapter in chapters)
+    if not frappe.has_permission("Course Chapter", "create"):
+        return _("You don't have permission to create chapters")
+    if has_lessons and not frappe.has_permission("Course Lesson", "create"):
+        return _("You don't have permission to create lessons")
+
+    # Mandatory fields the bulk insert does not fill would be left empty
+    filled = {
+        "Course Chapter": {"course", "title", "description"},
+        "Course Lesson": {"chapter", "course", "title", "content", "include_in_preview", "video_url"}
+    }
+    for doctype in ("Course Chapter", "Course Lesson") if has_lessons else ("Course Chapter",):
+        missing = [
+            df.label or df.fieldname
+            for df in frappe.get_meta(doctype).get("fields", {"reqd": 1})
+            if df.fieldname not in filled[doctype] and df.default in (None, "")
+        ]
+        if missing:
+            return _("{0} requires fields that cannot be set here: {1}").format(
+                _(doctype), ", ".join(missing)
+            )
+
+    for chapter in chapters:
+        lessons = chapter.get("lessons") or []
+        if not isinstance(lessons, list) or not all(isinstance(lesson, dict) for lesson in lessons):
+            return _("Chapter lessons must be a list of objects")
+
+        if "title" in chapter and not (isinstance(chapter["title"], str) and chapter["title"].strip()):
+            return _("Chapter title is required")
+        for fieldname in ("title", "description"):
+            error = _curriculum_value_error("Course Chapter", fieldname, chapter.get(fieldname))
+            if error:
+                return error
+
+        if not has_lessons:
+            continue
+        for lesson in lessons:
+            if "title" in lesson and not (isinstance(lesson["title"], str) and lesson["title"].strip()):
+                return _("Lesson title is required")
+            for fieldname, key in (("title", "title"), ("content", "content"), ("video_url", "videoUrl")):
+                error = _curriculum_value_error("Course Lesson", fieldname, lesson.get(key))
+                if error:
+                    return error
+
+    return None
+
+
+def insert_course_curriculum(course_name, chapters, owner):
+    """
+    Insert a new course's chapters and lessons with one bulk INSERT per DocType
+
+    Rows are written directly, so Course Chapter/Course Lesson controllers and
+    doc_events do not run: validate the input with validate_course_curriculum
+    first. The course's cached card and lesson count are cleared here instead
+    of by the hooks.
+
+    Args:
+        course_name: LMS Course the chapters belong to
+        chapters: List of chapter dicts with optional "lessons" lists (see create_course)
+        owner: User recorded as owner of the new rows
+    """
+    timestamp = now()
+    standard_values = [timestamp, timestamp, owner, owner]
+    standard_fields = ["creation", "modified", "owner", "modified_by"]
+
+    chapter_fields = ["name", "course", "title", "idx"]
+    has_chapter_description = _has_col("Course Chapter", "description")
+    if has_chapter_description:
+        chapter_fields.append("description")
+
+    has_lessons = _has_dt("Course Lesson")
+    lesson_fields = ["name", "chapter", "title", "idx"]
+    optional_lesson_fields = [
+        # (column, request key, default)
+        ("content", "content", ""),
+        ("course", None, course_name),
+        ("include_in_preview", "isPreview", 0),
+        ("video_url", "videoUrl", ""),
+    ]
+    optional_lesson_fields = [
+        field for field in optional_lesson_fields
+        if has_lessons and _has_col("Course Lesson", field[0])
+    ]
+    lesson_fields.extend(field[0] for field in optional_lesson_fields)
+
+    chapter_rows = []
+    lesson_rows = []
+    for idx, chapter_data in enumerate(chapters, 1):
+        chapter_name = frappe.generate_hash(length=10)
+        row = [chapter_name, course_name, chapter_data.get("title", f"Chapter {idx}"), idx]
+        if has_chapter_description:
+            row.append(chapter_data.get("description", ""))
+        chapter_rows.append(row + standard_values)
+
+        if not has_lessons:
+            continue
+
+        # Collect lessons for this chapter
+        for lesson_idx, lesson_data in enumerate(chapter_data.get("lessons") or [], 1):
+            row = [
+                frappe.generate_hash(length=10),
+                chapter_name,
+                lesson_data.get("title", f"Lesson {lesson_idx}"),
+                lesson_idx
+            ]
+            for _column, key, default in optional_lesson_fields:
+                row.append(lesson_data.get(key, default) if key else default)
+            lesson_rows.append(row + standard_values)
+
+    frappe.db.bulk_insert("Course Chapter", chapter_fields + standard_fields, chapter_rows)
+    if lesson_rows:
+        frappe.db.bulk_insert("Course Lesson", lesson_fields + standard_fields, lesson_rows)
+
+    frappe.cache().hdel(COURSE_CARD_CACHE_KEY, course_name)
+    frappe.cache().delete_value(f"total_lessons:{course_name}")
+
+
 @frappe.whitelist()
+@json_body(aliases={
+    "shortIntroduction": "short_introduction",
+    "isFeatured": "is_featured"
+})
 def create_course(
     title=None,
     description=None,
@@ -773,84 +1553,66 @@ def create_course(
         # Parse chapters if provided as JSON string
         if chapters and isinstance(chapters, str):
             try:
-                chapters = json.loads(chapters)
+                chapters = json_loads(chapters)
             except json.JSONDecodeError:
                 chapters = None
 
+        if chapters and isinstance(chapters, list) and _has_dt("Course Chapter"):
+            error = validate_course_curriculum(chapters)
+            if error:
+                return {
+                    "success": False,
+                    "message": error
+                }
+
         # Create course document
         course_doc = frappe.new_doc("LMS Course")
         course_doc.title = title
         course_doc.owner = current_user
 
         # Set optional fields if they exist
-        if description and hasattr(course_doc, 'description'):
+        if description and _has_col("LMS Course", "description"):
             course_doc.description = description
-        if short_introduction and hasattr(course_doc, 'short_introduction'):
+        if short_introduction and _has_col("LMS Course", "short_introduction"):
             course_doc.short_introduction = short_introduction
-        if category and hasattr(course_doc, 'category'):
+        if category and _has_col("LMS Course", "category"):
             course_doc.category = category
         if level:
-            if hasattr(course_doc, 'level'):
+            if _has_col("LMS Course", "level"):
                 course_doc.level = level
-            elif hasattr(course_doc, 'difficulty'):
+            elif _has_col("LMS Course", "difficulty"):
                 course_doc.difficulty = level
         if price is not None:
-            if hasattr(course_doc, 'course_price'):
+            if _has_col("LMS Course", "course_price"):
                 course_doc.course_price = flt(price)
-            if hasattr(course_doc, 'price'):
+            if _has_col("LMS Course", "price"):
                 course_doc.price = flt(price)
-            if hasattr(course_doc, 'paid'):
+            if _has_col("LMS Course", "paid"):
                 course_doc.paid = 1 if flt(price) > 0 else 0
-        if duration and hasattr(course_doc, 'duration'):
+        if duration and _has_col("LMS Course", "duration"):
             course_doc.duration = duration
-        if image and hasattr(course_doc, 'image'):
+        if image and _has_col("LMS Course", "image"):
             course_doc.image = image
         if is_featured:
-            if hasattr(course_doc, 'featured'):
+            if _has_col("LMS Course", "featured"):
                 course_doc.featured = 1
-            elif hasattr(course_doc, 'is_featured'):
+            elif _has_col("LMS Course", "is_featured"):
                 course_doc.is_featured = 1
 
         # Set instructor field if exists
-        if hasattr(course_doc, 'instructor'):
+        if _has_col("LMS Course", "instructor"):
             course_doc.instructor = current_user
 
         # Set published to true by default
-        if hasattr(course_doc, 'published'):
+        if _has_col("LMS Course", "published"):
             course_doc.published = 1
 
         course_doc.insert()
         course_name = course_doc.name
 
         # Create chapters and lessons if provided
-        if chapters and isinstance(chapters, list):
-            for idx, chapter_data in enumerate(chapters, 1):
-                if frappe.db.exists("DocType", "Course Chapter"):
-                    chapter_doc = frappe.new_doc("Course Chapter")
-                    chapter_doc.course = course_name
-                    chapter_doc.title = chapter_data.get("title", f"Chapter {idx}")
-                    if hasattr(chapter_doc, 'description'):
-                        chapter_doc.description = chapter_data.get("description", "")
-                    chapter_doc.idx = idx
-                    chapter_doc.insert()
-
-                    # Create lessons for this chapter
-                    lessons = chapter_data.get("lessons", [])
-                    for lesson_idx, lesson_data in enumerate(lessons, 1):
-                        if frappe.db.exists("DocType", "Course Lesson"):
-                            lesson_doc = frappe.new_doc("Course Lesson")
-                            lesson_doc.chapter = chapter_doc.name
-                            lesson_doc.title = lesson_data.get("title", f"Lesson {lesson_idx}")
-                            if hasattr(lesson_doc, 'content'):
-                                lesson_doc.content = lesson_data.get("content", "")
-                            if hasattr(lesson_doc, 'course'):
-                                lesson_doc.course = course_name
-                            if hasattr(lesson_doc, 'include_in_preview'):
-                                lesson_doc.include_in_preview = lesson_data.get("isPreview", 0)
-                            if hasattr(lesson_doc, 'video_url'):
-                                lesson_doc.video_url = lesson_data.get("videoUrl", "")
-                            lesson_doc.idx = lesson_idx
-                            lesson_doc.insert()
+        if chapters and isinstance(chapters, list) and _has_dt("Course Chapter"):
+            insert_course_curriculum(course_name, chapters, current_user)
 
         frappe.db.commit()
 
@@ -870,6 +1632,11 @@ def create_course(
 
 
 @frappe.whitelist()
+@json_body(aliases={
+    "courseId": "course_id",
+    "shortIntroduction": "short_introduction",
+    "isFeatured": "is_featured"
+})
 def update_course(
     course_id=None,
     title=None,
@@ -903,61 +1670,67 @@ def update_course(
                 "message": _("Course ID is required")
             }
 
-        if not frappe.db.exists("LMS Course", course_id):
+        try:
+            course_doc = frappe.get_doc("LMS Course", course_id)
+        except frappe.DoesNotExistError:
+            frappe.clear_last_message()
             return {
                 "success": False,
                 "message": _("Course not found")
             }
 
         current_user = frappe.session.user
-        course_doc = frappe.get_doc("LMS Course", course_id)
 
-        # Check if user owns the course or is admin
-        is_owner = course_doc.owner == current_user
-        is_instructor = hasattr(course_doc, 'instructor') and course_doc.instructor == current_user
-        is_admin = "System Manager" in frappe.get_roles(current_user)
+        # Check if user owns the course or is admin; roles are only read when needed
+        can_update = (
+            course_doc.owner == current_user or
+            course_doc.get("instructor") == current_user or
+            "System Manager" in _user_roles(current_user)
+        )
 
-        if not (is_owner or is_instructor or is_admin):
+        if not can_update:
             return {
                 "success": False,
                 "message": _("You don't have permission to update this course")
             }
 
         # Update fields
+        fields = _table_columns("LMS Course")
+        updates = {}
         if title:
-            course_doc.title = title
-        if description and hasattr(course_doc, 'description'):
-            course_doc.description = description
-        if short_introduction and hasattr(course_doc, 'short_introduction'):
-            course_doc.short_introduction = short_introduction
-        if category and hasattr(course_doc, 'category'):
-            course_doc.category = category
+            updates["title"] = title
+        if description and "description" in fields:
+            updates["description"] = description
+        if short_introduction and "short_introduction" in fields:
+            updates["short_introduction"] = short_introduction
+        if category and "category" in fields:
+            updates["category"] = category
         if level:
-            if hasattr(course_doc, 'level'):
-                course_doc.level = level
-            elif hasattr(course_doc, 'difficulty'):
-                course_doc.difficulty = level
+            if "level" in fields:
+                updates["level"] = level
+            elif "difficulty" in fields:
+                updates["difficulty"] = level
         if price is not None:
-            if hasattr(course_doc, 'course_price'):
-                course_doc.course_price = flt(price)
-            if hasattr(course_doc, 'price'):
-                course_doc.price = flt(price)
-            if hasattr(course_doc, 'paid'):
-                course_doc.paid = 1 if flt(price) > 0 else 0
-        if duration and hasattr(course_doc, 'duration'):
-            course_doc.duration = duration
-        if image and hasattr(course_doc, 'image'):
-            course_doc.image = image
+            if "course_price" in fields:
+                updates["course_price"] = flt(price)
+            if "price" in fields:
+                updates["price"] = flt(price)
+            if "paid" in fields:
+                updates["paid"] = 1 if flt(price) > 0 else 0
+        if duration and "duration" in fields:
+            updates["duration"] = duration
+        if image and "image" in fields:
+            updates["image"] = image
         if is_featured is not None:
-            if hasattr(course_doc, 'featured'):
-                course_doc.featured = 1 if is_featured else 0
-            elif hasattr(course_doc, 'is_featured'):
-                course_doc.is_featured = 1 if is_featured else 0
-        if published is not None and hasattr(course_doc, 'published'):
-            course_doc.published = 1 if published else 0
-
+            if "featured" in fields:
+                updates["featured"] = 1 if is_featured else 0
+            elif "is_featured" in fields:
+                updates["is_featured"] = 1 if is_featured else 0
+        if published is not None and "published" in fields:
+            updates["published"] = 1 if published else 0
+
+        course_doc.update(updates)
         course_doc.save()
-        frappe.db.commit()
 
         return {
             "success": True,
@@ -974,6 +1747,115 @@ def update_course(
 
 # ==================== LESSON DETAILS API ====================
 
+def _course_access(user, course_id):
+    """
+    A user's relationship to a course, loaded with one query and memoized for the request
+
+    Returns:
+        frappe._dict(enrolled, is_owner, is_instructor, has_access), or None if
+        the course does not exist
+    """
+    memo = frappe.local.flags.setdefault("course_access", {})
+    if (user, course_id) in memo:
+        return memo[(user, course_id)]
+
+    instructor_column = "c.instructor" if _has_col("LMS Course", "instructor") else "NULL"
+    enrolled_column = (
+        """EXISTS(
+            SELECT 1 FROM `tabLMS Enrollment` e
+            WHERE e.course = c.name AND e.member = %(user)s
+        )"""
+        if _has_dt("LMS Enrollment") else "0"
+    )
+    rows = frappe.db.sql(
+        f"""
+        SELECT c.owner, {instructor_column} AS instructor, {enrolled_column} AS enrolled
+        FROM `tabLMS Course` c
+        WHERE c.name = %(course)s
+        """,
+        {"user": user, "course": course_id},
+        as_dict=True
+    )
+
+    access = None
+    if rows:
+        row = rows[0]
+        access = frappe._dict(
+            enrolled=bool(row.enrolled),
+            is_owner=row.owner == user,
+            is_instructor=bool(row.instructor) and row.instructor == user
+        )
+        access.has_access = access.enrolled or access.is_owner or access.is_instructor
+
+    memo[(user, course_id)] = access
+    return access
+
+
+# Optional Course Lesson columns returned by get_lesson_details
+LESSON_DETAIL_FIELDS = [
+    "include_in_preview",
+    "chapter",
+    "content",
+    "video_url",
+    "duration",
+    "youtube_video_id",
+    "quiz_id"
+]
+
+
+def get_lesson_with_access(lesson_id, user):
+    """
+    Load a lesson with its course and the user's access facts in one query
+
+    The course comes from the lesson's own course field, falling back to its
+    chapter's course. Missing optional columns are returned as NULL.
+
+    Returns:
+        frappe._dict with the lesson columns plus course_name, course_owner,
+        course_instructor and enrolled, or None if the lesson does not exist
+    """
+    columns = ["l.name", "l.title", "l.idx"] + [
+        f"l.`{field}`" if _has_col("Course Lesson", field) else f"NULL AS `{field}`"
+        for field in LESSON_DETAIL_FIELDS
+    ]
+
+    joins = []
+    course_sources = []
+    if _has_col("Course Lesson", "course"):
+        course_sources.append("NULLIF(l.course, '')")
+    if _has_col("Course Lesson", "chapter") and _has_dt("Course Chapter"):
+        joins.append("LEFT JOIN `tabCourse Chapter` ch ON ch.name = l.chapter")
+        course_sources.append("ch.course")
+    course_expr = f"COALESCE({', '.join(course_sources)})" if course_sources else "NULL"
+    columns.append(f"{course_expr} AS course_name")
+
+    joins.append(f"LEFT JOIN `tabLMS Course` co ON co.name = {course_expr}")
+    columns.append("co.owner AS course_owner")
+    columns.append(
+        "co.instructor AS course_instructor" if _has_col("LMS Course", "instructor")
+        else "NULL AS course_instructor"
+    )
+    columns.append(
+        """EXISTS(
+            SELECT 1 FROM `tabLMS Enrollment` e
+            WHERE e.course = co.name AND e.member = %(user)s
+        ) AS enrolled"""
+        if _has_dt("LMS Enrollment") else "0 AS enrolled"
+    )
+
+    rows = frappe.db.sql(
+        f"""
+        SELECT {", ".join(columns)}
+        FROM `tabCourse Lesson` l
+        {" ".join(joins)}
+        WHERE l.name = %(lesson)s
+        """,
+        {"lesson": lesson_id, "user": user},
+        as_dict=True
+    )
+    return rows[0] if rows else None
+
+
 @frappe.whitelist(allow_guest=True)
 def get_lesson_details(lesson_id=None, course_id=None):
     """
@@ -996,63 +1878,48 @@ def get_lesson_details(lesson_id=None, course_id=None):
                 "message": _("Lesson ID is required")
             }
 
-        if not frappe.db.exists("DocType", "Course Lesson"):
+        if not _has_dt("Course Lesson"):
             return {
                 "success": False,
                 "message": _("Course Lesson doctype not found")
             }
 
-        if not frappe.db.exists("Course Lesson", lesson_id):
+        current_user = frappe.session.user
+        lesson = get_lesson_with_access(lesson_id, current_user)
+        if not lesson:
             return {
                 "success": False,
                 "message": _("Lesson not found")
             }
 
-        lesson_doc = frappe.get_doc("Course Lesson", lesson_id)
-        current_user = frappe.session.user
-
         # Check if this is a preview lesson or user has access
-        is_preview = bool(lesson_doc.include_in_preview) if hasattr(lesson_doc, 'include_in_preview') else False
+        is_preview = bool(lesson.include_in_preview)
         is_guest = current_user == "Guest"
+        course_name = lesson.course_name
 
-        # Get course info for enrollment check
-        course_name = None
-        if hasattr(lesson_doc, 'course') and lesson_doc.course:
-            course_name = lesson_doc.course
-        elif hasattr(lesson_doc, 'chapter') and lesson_doc.chapter:
-            chapter = frappe.get_doc("Course Chapter", lesson_doc.chapter)
-            course_name = chapter.course if hasattr(chapter, 'course') else None
-
-        # Check enrollment if not preview and not guest
+        # Enrolled students, the course owner and its instructor can open any lesson
         has_access = is_preview
         if not is_guest and course_name:
-            if frappe.db.exists("LMS Enrollment", {"course": course_name, "member": current_user}):
+            if lesson.enrolled or current_user in (lesson.course_owner, lesson.course_instructor):
                 has_access = True
-            # Check if user is the course owner
-            if frappe.db.exists("LMS Course", course_name):
-                course_doc = frappe.get_doc("LMS Course", course_name)
-                if course_doc.owner == current_user:
-                    has_access = True
-                if hasattr(course_doc, 'instructor') and course_doc.instructor == current_user:
-                    has_access = True
 
         # Return limited info for non-enrolled users on non-preview lessons
         lesson_data = {
-            "id": lesson_doc.name,
-            "title": lesson_doc.title,
+            "id": lesson.name,
+            "title": lesson.title,
             "isPreview": is_preview,
-            "order": lesson_doc.idx if hasattr(lesson_doc, 'idx') else 0,
-            "chapterId": lesson_doc.chapter if hasattr(lesson_doc, 'chapter') else None,
+            "order": lesson.idx or 0,
+            "chapterId": lesson.chapter,
             "courseId": course_name
         }
 
         if has_access:
             # Include full content for enrolled users or preview lessons
-            lesson_data["content"] = lesson_doc.content if hasattr(lesson_doc, 'content') else ""
-            lesson_data["videoUrl"] = lesson_doc.video_url if hasattr(lesson_doc, 'video_url') else ""
-            lesson_data["duration"] = lesson_doc.duration if hasattr(lesson_doc, 'duration') else ""
-            lesson_data["youtubeVideoId"] = lesson_doc.youtube_video_id if hasattr(lesson_doc, 'youtube_video_id') else ""
-            lesson_data["quizId"] = lesson_doc.quiz_id if hasattr(lesson_doc, 'quiz_id') else None
+            lesson_data["content"] = lesson.content or ""
+            lesson_data["videoUrl"] = lesson.video_url or ""
+            lesson_data["duration"] = lesson.duration or ""
+            lesson_data["youtubeVideoId"] = lesson.youtube_video_id or ""
+            lesson_data["quizId"] = lesson.quiz_id
         else:
             lesson_data["requiresEnrollment"] = True
 
@@ -1091,45 +1958,71 @@ def get_chapter_lessons(chapter_id=None):
                 "message": _("Chapter ID is required")
             }
 
-        if not frappe.db.exists("DocType", "Course Chapter"):
+        if not _has_dt("Course Chapter"):
             return {
                 "success": False,
                 "message": _("Course Chapter doctype not found")
             }
 
-        if not frappe.db.exists("Course Chapter", chapter_id):
+        chapter = frappe.db.get_value(
+            "Course Chapter",
+            chapter_id,
+            [
+                field for field in ("name", "title", "description", "course")
+                if _has_col("Course Chapter", field)
+            ],
+            as_dict=True
+        )
+        if not chapter:
             return {
                 "success": False,
                 "message": _("Chapter not found")
             }
 
-        chapter_doc = frappe.get_doc("Course Chapter", chapter_id)
         current_user = frappe.session.user
         is_guest = current_user == "Guest"
 
         # Check enrollment
-        course_name = chapter_doc.course if hasattr(chapter_doc, 'course') else None
+        course_name = chapter.get("course")
         has_access = False
 
         if not is_guest and course_name:
-            if frappe.db.exists("LMS Enrollment", {"course": course_name, "member": current_user}):
-                has_access = True
-            if frappe.db.exists("LMS Course", course_name):
-                course_doc = frappe.get_doc("LMS Course", course_name)
-                if course_doc.owner == current_user:
-                    has_access = True
-                if hasattr(course_doc, 'instructor') and course_doc.instructor == current_user:
-                    has_access = True
+            access = _course_access(current_user, course_name)
+            has_access = bool(access and access.has_access)
 
         lessons = []
-        if frappe.db.exists("DocType", "Course Lesson"):
+        if _has_dt("Course Lesson"):
+            # Content columns are only read for enrolled users or preview lessons
+            list_fields = [
+                field for field in ("name", "title", "idx", "include_in_preview", "duration")
+                if _has_col("Course Lesson", field)
+            ]
+            content_fields = [
+                field for field in ("content", "video_url", "youtube_video_id")
+                if _has_col("Course Lesson", field)
+            ]
+
             lesson_docs = frappe.get_all(
                 "Course Lesson",
                 filters={"chapter": chapter_id},
-                fields=["*"],
+                fields=list_fields + content_fields if has_access else list_fields,
                 order_by="idx"
             )
 
+            if not has_access and content_fields:
+                preview_names = [lesson.name for lesson in lesson_docs if lesson.get("include_in_preview")]
+                if preview_names:
+                    preview_content = {
+                        row.name: row
+                        for row in frappe.get_all(
+                            "Course Lesson",
+                            filters={"name": ["in", preview_names]},
+                            fields=["name"] + content_fields
+                        )
+                    }
+                    for lesson in lesson_docs:
+                        lesson.update(preview_content.get(lesson.name, {}))
+
             for lesson in lesson_docs:
                 is_preview = bool(lesson.get("include_in_preview", 0))
 
@@ -1155,9 +2048,9 @@ def get_chapter_lessons(chapter_id=None):
             "success": True,
             "lessons": lessons,
             "chapter": {
-                "id": chapter_doc.name,
-                "title": chapter_doc.title,
-                "description": chapter_doc.description if hasattr(chapter_doc, 'description') else "",
+                "id": chapter.name,
+                "title": chapter.title,
+                "description": chapter.get("description", ""),
                 "courseId": course_name
             },
             "hasAccess": has_access
@@ -1173,6 +2066,151 @@ def get_chapter_lessons(chapter_id=None):
 
 # ==================== COURSE PROGRESS API ====================
 
+def get_course_lesson_names(course_id):
+    """Names of a course's lessons (through its chapters), in curriculum order"""
+    if not (_has_dt("Course Chapter") and _has_dt("Course Lesson")):
+        return []
+
+    return frappe.db.sql_list(
+        """
+        SELECT l.name
+        FROM `tabCourse Lesson` l
+        INNER JOIN `tabCourse Chapter` ch ON ch.name = l.chapter
+        WHERE ch.course = %s
+        ORDER BY ch.idx, l.idx
+        """,
+        course_id
+    )
+
+
+def count_course_lessons(course_id):
+    """
+    Number of lessons in a course, counted through its chapters
+
+    Cached per course for a day; Course Chapter/Course Lesson doc_events drop
+    the count when lessons are added, moved or removed.
+    """
+    if not (_has_dt("Course Chapter") and _has_dt("Course Lesson")):
+        return 0
+
+    cache_key = f"total_lessons:{course_id}"
+    total = frappe.cache().get_value(cache_key)
+    if total is None:
+        total = frappe.db.sql(
+            """
+            SELECT COUNT(*)
+            FROM `tabCourse Lesson` l
+            INNER JOIN `tabCourse Chapter` ch ON ch.name = l.chapter
+            WHERE ch.course = %s
+            """,
+            course_id
+        )[0][0]
+        frappe.cache().set_value(cache_key, total, expires_in_sec=LESSON_COUNT_CACHE_TTL)
+
+    return total
+
+
+def _progress_value(cached):
+    """
+    Cached progress as a dict
+
+    Frappe's cache pickles values, so progress dicts are stored as-is; entries
+    written before that were JSON strings and are decoded here.
+    """
+    if isinstance(cached, (str, bytes)):
+        return json_loads(cached)
+    return cached
+
+
+def lesson_progress_cache_key(user, course_id):
+    """Redis hash holding a user's cache-based lesson progress for one course"""
+    return f"course_lesson_progress:{user}:{course_id}"
+
+
+def save_cached_lesson_progress(user, course_id, lesson_id, progress):
+    """
+    Write one lesson's progress into the user's course progress hash
+
+    The marker check rides in the same round-trip; a hash that was never
+    checked for legacy keys is migrated right after, so writing new progress
+    never hides progress saved before the hash existed.
+    """
+    cache = frappe.cache()
+    key = cache.make_key(lesson_progress_cache_key(user, course_id))
+    pipe = cache.pipeline()
+    pipe.hexists(key, LEGACY_PROGRESS_CHECKED)
+    pipe.hset(key, lesson_id, pickle.dumps(progress))
+    pipe.expire(key, PROGRESS_CACHE_TTL)
+    checked, _written, _expired = pipe.execute()
+
+    if not checked:
+        migrate_legacy_lesson_progress(user, course_id)
+
+
+def migrate_legacy_lesson_progress(user, course_id):
+    """
+    Copy a user's legacy lesson_progress:{user}:{lesson} keys into the course progress hash
+
+    Entries already in the hash are newer and are kept. The hash is marked with
+    LEGACY_PROGRESS_CHECKED, so the copy runs once per user and course even when
+    there is nothing to copy.
+
+    Returns:
+        {lesson_id: progress} found under the legacy keys
+    """
+    lesson_names = get_course_lesson_names(course_id)
+    legacy = {
+        name: _progress_value(cached)
+        for name, cached in zip(
+            lesson_names,
+            get_cached_values([f"lesson_progress:{user}:{name}" for name in lesson_names])
+        )
+        if cached
+    }
+
+    cache = frappe.cache()
+    key = cache.make_key(lesson_progress_cache_key(user, course_id))
+    pipe = cache.pipeline()
+    for lesson_id, progress in legacy.items():
+        pipe.hsetnx(key, lesson_id, pickle.dumps(progress))
+    pipe.hset(key, LEGACY_PROGRESS_CHECKED, pickle.dumps(1))
+    pipe.expire(key, PROGRESS_CACHE_TTL)
+    pipe.execute()
+    return legacy
+
+
+def get_cached_lesson_progress(user, course_id):
+    """
+    All of a user's cache-based lesson progress for a course, as {lesson_id: progress}
+
+    A hash without the LEGACY_PROGRESS_CHECKED marker is migrated first; progress
+    written to the hash since then wins over the legacy value for the same lesson.
+    """
+    stored = frappe.cache().hgetall(lesson_progress_cache_key(user, course_id))
+
+    progress = {}
+    for lesson_id, value in stored.items():
+        lesson_id = lesson_id.decode() if isinstance(lesson_id, bytes) else lesson_id
+        progress[lesson_id] = value
+
+    if progress.pop(LEGACY_PROGRESS_CHECKED, None) is None:
+        progress = {**migrate_legacy_lesson_progress(user, course_id), **progress}
+
+    return {lesson_id: _progress_value(value) for lesson_id, value in progress.items()}
+
+
+def get_cached_values(keys):
+    """frappe.cache().get_value for many keys in one MGET; missing keys give None"""
+    if not keys:
+        return []
+
+    cache = frappe.cache()
+    return [
+        pickle.loads(value) if value is not None else None
+        for value in cache.mget([cache.make_key(key) for key in keys])
+    ]
+
+
 @frappe.whitelist()
 def save_progress(
     course_id=None,
@@ -1215,74 +2253,75 @@ def save_progress(
                 "message": _("Course ID is required")
             }
 
-        if not frappe.db.exists("LMS Course", course_id):
+        if not _course_access(current_user, course_id):
             return {
                 "success": False,
                 "message": _("Course not found")
             }
 
-        # Check if LMS Course Progress doctype exists, create if not
-        progress_doctype = "LMS Course Progress"
-        if not frappe.db.exists("DocType", progress_doctype):
-            # Try alternative doctypes
-            if frappe.db.exists("DocType", "Course Progress"):
-                progress_doctype = "Course Progress"
-            else:
-                # Create a simple progress tracking using custom doctype or cache
-                # For now, use cache-based progress tracking
-                cache_key = f"course_progress:{current_user}:{course_id}"
-                if lesson_id:
-                    cache_key = f"lesson_progress:{current_user}:{lesson_id}"
-
-                progress_data = {
-                    "user": current_user,
-                    "course_id": course_id,
-                    "lesson_id": lesson_id,
-                    "chapter_id": chapter_id,
-                    "progress_percent": flt(progress_percent) if progress_percent else 0,
-                    "is_completed": bool(is_completed),
-                    "video_position": cint(video_position) if video_position else 0,
-                    "notes": notes or "",
-                    "updated_at": frappe.utils.now()
-                }
+        # Check which course progress doctype is installed, if any
+        progress_doctype = _progress_doctype()
+        if not progress_doctype:
+            # Create a simple progress tracking using custom doctype or cache
+            # For now, use cache-based progress tracking
+            progress_data = {
+                "user": current_user,
+                "course_id": course_id,
+                "lesson_id": lesson_id,
+                "chapter_id": chapter_id,
+                "progress_percent": flt(progress_percent) if progress_percent else 0,
+                "is_completed": bool(is_completed),
+                "video_position": cint(video_position) if video_position else 0,
+                "notes": notes or "",
+                "updated_at": frappe.utils.now()
+            }
 
-                frappe.cache().set_value(cache_key, json.dumps(progress_data), expires_in_sec=86400 * 365)  # 1 year
+            if lesson_id:
+                save_cached_lesson_progress(current_user, course_id, lesson_id, progress_data)
+            else:
+                frappe.cache().set_value(
+                    f"course_progress:{current_user}:{course_id}",
+                    progress_data,
+                    expires_in_sec=PROGRESS_CACHE_TTL
+                )
 
-                return {
-                    "success": True,
-                    "message": _("Progress saved successfully")
-                }
+            return {
+                "success": True,
+                "message": _("Progress saved successfully")
+            }
 
         # Use doctype-based progress tracking
         filters = {"course": course_id, "member": current_user}
         if lesson_id:
             filters["lesson"] = lesson_id
 
-        existing = frappe.get_all(progress_doctype, filters=filters, limit=1)
+        # Update progress fields
+        updates = {}
+        if progress_percent is not None and _has_col(progress_doctype, "progress"):
+            updates["progress"] = flt(progress_percent)
+        if is_completed and _has_col(progress_doctype, "is_complete"):
+            updates["is_complete"] = 1
+        if video_position is not None and _has_col(progress_doctype, "video_position"):
+            updates["video_position"] = cint(video_position)
+        if notes and _has_col(progress_doctype, "notes"):
+            updates["notes"] = notes
+
+        existing = frappe.db.get_value(progress_doctype, filters, "name")
 
         if existing:
-            progress_doc = frappe.get_doc(progress_doctype, existing[0].name)
+            # Frequent updates (e.g. video position) go straight to a single UPDATE
+            if updates:
+                frappe.db.set_value(progress_doctype, existing, updates)
         else:
             progress_doc = frappe.new_doc(progress_doctype)
             progress_doc.course = course_id
             progress_doc.member = current_user
-            if lesson_id and hasattr(progress_doc, 'lesson'):
+            if lesson_id and _has_col(progress_doctype, "lesson"):
                 progress_doc.lesson = lesson_id
-            if chapter_id and hasattr(progress_doc, 'chapter'):
+            if chapter_id and _has_col(progress_doctype, "chapter"):
                 progress_doc.chapter = chapter_id
-
-        # Update progress fields
-        if progress_percent is not None and hasattr(progress_doc, 'progress'):
-            progress_doc.progress = flt(progress_percent)
-        if is_completed and hasattr(progress_doc, 'is_complete'):
-            progress_doc.is_complete = 1
-        if video_position is not None and hasattr(progress_doc, 'video_position'):
-            progress_doc.video_position = cint(video_position)
-        if notes and hasattr(progress_doc, 'notes'):
-            progress_doc.notes = notes
-
-        progress_doc.save(ignore_permissions=True)
-        frappe.db.commit()
+            progress_doc.update(updates)
+            progress_doc.insert(ignore_permissions=True)
 
         return {
             "success": True,
@@ -1327,56 +2366,44 @@ def get_progress(course_id=None, lesson_id=None):
             }
 
         # Check for progress doctype
-        progress_doctype = "LMS Course Progress"
-        if not frappe.db.exists("DocType", progress_doctype):
-            if frappe.db.exists("DocType", "Course Progress"):
-                progress_doctype = "Course Progress"
-            else:
-                # Use cache-based progress
-                if lesson_id:
-                    cache_key = f"lesson_progress:{current_user}:{lesson_id}"
-                    cached = frappe.cache().get_value(cache_key)
-                    if cached:
-                        return {
-                            "success": True,
-                            "progress": json.loads(cached)
-                        }
-                else:
-                    # Get all lesson progress for course
-                    course_progress = []
-                    if frappe.db.exists("DocType", "Course Chapter"):
-                        chapters = frappe.get_all("Course Chapter", filters={"course": course_id}, fields=["name"])
-                        for chapter in chapters:
-                            if frappe.db.exists("DocType", "Course Lesson"):
-                                lessons = frappe.get_all("Course Lesson", filters={"chapter": chapter.name}, fields=["name"])
-                                for lesson in lessons:
-                                    cache_key = f"lesson_progress:{current_user}:{lesson.name}"
-                                    cached = frappe.cache().get_value(cache_key)
-                                    if cached:
-                                        course_progress.append(json.loads(cached))
-
-                    # Calculate overall progress
-                    total_lessons = sum([len(frappe.get_all("Course Lesson", filters={"chapter": c.name}))
-                                        for c in frappe.get_all("Course Chapter", filters={"course": course_id})])
-                    completed_lessons = len([p for p in course_progress if p.get("is_completed")])
-                    overall_percent = (completed_lessons / total_lessons * 100) if total_lessons > 0 else 0
-
+        progress_doctype = _progress_doctype()
+        if not progress_doctype:
+            # Use cache-based progress
+            if lesson_id:
+                cached = (
+                    frappe.cache().hget(lesson_progress_cache_key(current_user, course_id), lesson_id) or
+                    frappe.cache().get_value(f"lesson_progress:{current_user}:{lesson_id}")
+                )
+                if cached:
                     return {
                         "success": True,
-                        "progress": {
-                            "courseId": course_id,
-                            "overallProgress": round(overall_percent, 1),
-                            "completedLessons": completed_lessons,
-                            "totalLessons": total_lessons,
-                            "lessonProgress": course_progress
-                        }
+                        "progress": _progress_value(cached)
                     }
+            else:
+                # Get all lesson progress for course from its hash in one round-trip
+                course_progress = list(get_cached_lesson_progress(current_user, course_id).values())
+
+                # Calculate overall progress
+                total_lessons = count_course_lessons(course_id)
+                completed_lessons = len([p for p in course_progress if p.get("is_completed")])
+                overall_percent = (completed_lessons / total_lessons * 100) if total_lessons > 0 else 0
 
                 return {
                     "success": True,
-                    "progress": None
+                    "progress": {
+                        "courseId": course_id,
+                        "overallProgress": round(overall_percent, 1),
+                        "completedLessons": completed_lessons,
+                        "totalLessons": total_lessons,
+                        "lessonProgress": course_progress
+                    }
                 }
 
+            return {
+                "success": True,
+                "progress": None
+            }
+
         # Use doctype-based progress
         if lesson_id:
             progress = frappe.get_all(
@@ -1404,12 +2431,7 @@ def get_progress(course_id=None, lesson_id=None):
                 fields=["*"]
             )
 
-            total_lessons = 0
-            if frappe.db.exists("DocType", "Course Chapter"):
-                chapters = frappe.get_all("Course Chapter", filters={"course": course_id})
-                for chapter in chapters:
-                    if frappe.db.exists("DocType", "Course Lesson"):
-                        total_lessons += frappe.db.count("Course Lesson", {"chapter": chapter.name})
+            total_lessons = count_course_lessons(course_id)
 
             completed = len([p for p in all_progress if p.get("is_complete")])
             overall = (completed / total_lessons * 100) if total_lessons > 0 else 0
@@ -1443,14 +2465,49 @@ def get_progress(course_id=None, lesson_id=None):
         }
 
 
+def get_course_progress_summary(user, course_id):
+    """
+    Completed/total lesson counts for a user's course progress, without per-lesson details
+
+    Returns:
+        {"courseId", "overallProgress", "completedLessons", "totalLessons"}
+    """
+    progress_doctype = _progress_doctype()
+    if not progress_doctype:
+        completed = len([
+            p for p in get_cached_lesson_progress(user, course_id).values()
+            if p.get("is_completed")
+        ])
+    elif _has_col(progress_doctype, "is_complete"):
+        completed = frappe.db.count(
+            progress_doctype, {"course": course_id, "member": user, "is_complete": 1}
+        )
+    else:
+        completed = 0
+
+    total_lessons = count_course_lessons(course_id)
+    overall = (completed / total_lessons * 100) if total_lessons > 0 else 0
+
+    return {
+        "courseId": course_id,
+        "overallProgress": round(overall, 1),
+        "completedLessons": completed,
+        "totalLessons": total_lessons
+    }
+
+
 @frappe.whitelist()
-def mark_lesson_complete(lesson_id=None, course_id=None):
+def mark_lesson_complete(lesson_id=None, course_id=None, include_course_progress=True):
     """
     Mark a lesson as completed
 
     Args:
         lesson_id: Lesson document name (required)
         course_id: Course document name (optional, will be derived if not provided)
+        include_course_progress: Return the full course progress, including
+            lessonProgress, as get_progress does (default). Pass 0 to get only
+            courseId, overallProgress, completedLessons and totalLessons, which
+            skips the per-lesson listing
 
     Returns:
         {
@@ -1475,13 +2532,15 @@ def mark_lesson_complete(lesson_id=None, course_id=None):
 
         # Get course_id from lesson if not provided
         if not course_id:
-            if frappe.db.exists("DocType", "Course Lesson"):
-                lesson = frappe.get_doc("Course Lesson", lesson_id)
-                if hasattr(lesson, 'course') and lesson.course:
+            if _has_dt("Course Lesson"):
+                lesson_fields = [field for field in ("course", "chapter") if _has_col("Course Lesson", field)]
+                lesson = lesson_fields and frappe.db.get_value(
+                    "Course Lesson", lesson_id, lesson_fields, as_dict=True
+                )
+                if lesson and lesson.get("course"):
                     course_id = lesson.course
-                elif hasattr(lesson, 'chapter') and lesson.chapter:
-                    chapter = frappe.get_doc("Course Chapter", lesson.chapter)
-                    course_id = chapter.course if hasattr(chapter, 'course') else None
+                elif lesson and lesson.get("chapter") and _has_col("Course Chapter", "course"):
+                    course_id = frappe.db.get_value("Course Chapter", lesson.chapter, "course")
 
         if not course_id:
             return {
@@ -1501,12 +2560,16 @@ def mark_lesson_complete(lesson_id=None, course_id=None):
             return result
 
         # Get updated course progress
-        progress_result = get_progress(course_id=course_id)
+        if sbool(include_course_progress):
+            progress_result = get_progress(course_id=course_id)
+            course_progress = progress_result.get("progress") if progress_result.get("success") else None
+        else:
+            course_progress = get_course_progress_summary(current_user, course_id)
 
         return {
             "success": True,
             "message": _("Lesson marked as complete"),
-            "courseProgress": progress_result.get("progress") if progress_result.get("success") else None
+            "courseProgress": course_progress
         }
 
     except Exception as e:
@@ -1551,57 +2614,62 @@ def get_live_classes(
         page_size = cint(page_size) or 10
 
         # Check if Live Class doctype exists
-        live_class_doctype = "LMS Live Class"
-        if not frappe.db.exists("DocType", live_class_doctype):
-            if frappe.db.exists("DocType", "Live Class"):
-                live_class_doctype = "Live Class"
-            else:
-                # Return empty if doctype doesn't exist
-                return {
-                    "success": True,
-                    "liveClasses": [],
-                    "totalCount": 0,
-                    "message": _("Live class feature not configured")
-                }
+        live_class_doctype = _live_class_doctype()
+        if not live_class_doctype:
+            # Return empty if doctype doesn't exist
+            return {
+                "success": True,
+                "liveClasses": [],
+                "totalCount": 0,
+                "message": _("Live class feature not configured")
+            }
 
         # Build filters
         filters = {}
         if course_id:
             filters["course"] = course_id
         if instructor_id:
-            if frappe.db.has_column(live_class_doctype, "instructor"):
+            if _has_col(live_class_doctype, "instructor"):
                 filters["instructor"] = instructor_id
             else:
                 filters["owner"] = instructor_id
         if status:
-            if frappe.db.has_column(live_class_doctype, "status"):
+            if _has_col(live_class_doctype, "status"):
                 filters["status"] = status
 
-        # Get live classes
+        # Upcoming classes are listed soonest first; classes without a start time never match
+        order_by = "creation desc"
+        if upcoming_only:
+            if _has_col(live_class_doctype, "start_time"):
+                filters["start_time"] = [">", now_datetime()]
+                order_by = "start_time asc"
+            else:
+                filters["name"] = ["in", []]
+
+        # Count matches, then fetch and format only the requested page
+        start_idx = (page - 1) * page_size
+        total_count = frappe.db.count(live_class_doctype, filters)
         live_classes = frappe.get_all(
             live_class_doctype,
             filters=filters,
-            fields=["*"],
-            order_by="creation desc"
+            fields=get_live_class_fields(live_class_doctype),
+            order_by=order_by,
+            start=start_idx,
+            page_length=page_size
         )
 
-        # Filter upcoming if requested
-        if upcoming_only:
-            from frappe.utils import now_datetime, get_datetime
-            current_time = now_datetime()
-            live_classes = [
-                lc for lc in live_classes
-                if (hasattr(lc, 'start_time') or lc.get('start_time')) and
-                get_datetime(lc.get('start_time') or lc.start_time) > current_time
-            ]
+        # Load all instructors at once
+        instructor_map = get_instructors_bulk(
+            {lc.get("instructor") or lc.get("owner") for lc in live_classes}
+        )
 
         # Format for frontend
         formatted_classes = []
         for lc in live_classes:
             instructor_info = {"id": "", "name": "", "avatar": ""}
             instructor_id = lc.get("instructor") or lc.get("owner")
-            if instructor_id and frappe.db.exists("User", instructor_id):
-                user = frappe.get_doc("User", instructor_id)
+            user = instructor_map.get(instructor_id)
+            if user:
                 instructor_info = {
                     "id": instructor_id,
                     "name": user.full_name or instructor_id,
@@ -1642,19 +2710,15 @@ def get_live_classes(
                 "currentParticipants": cint(lc.get("current_participants")) or 0,
                 "isRecorded": bool(lc.get("is_recorded") or lc.get("record_session")),
                 "recordingUrl": lc.get("recording_url") or "",
-                "createdAt": str(lc.creation) if hasattr(lc, 'creation') else ""
+                "createdAt": str(lc.get("creation") or "")
             })
 
         # Pagination
-        total_count = len(formatted_classes)
         total_pages = (total_count + page_size - 1) // page_size
-        start_idx = (page - 1) * page_size
-        end_idx = start_idx + page_size
-        paginated = formatted_classes[start_idx:end_idx]
 
         return {
             "success": True,
-            "liveClasses": paginated,
+            "liveClasses": formatted_classes,
             "totalCount": total_count,
             "currentPage": page,
             "totalPages": total_pages,
@@ -1691,28 +2755,33 @@ def get_live_class(class_id=None):
                 "message": _("Live class ID is required")
             }
 
-        live_class_doctype = "LMS Live Class"
-        if not frappe.db.exists("DocType", live_class_doctype):
-            if frappe.db.exists("DocType", "Live Class"):
-                live_class_doctype = "Live Class"
-            else:
-                return {
-                    "success": False,
-                    "message": _("Live class feature not configured")
-                }
+        live_class_doctype = _live_class_doctype()
+        if not live_class_doctype:
+            return {
+                "success": False,
+                "message": _("Live class feature not configured")
+            }
 
-        if not frappe.db.exists(live_class_doctype, class_id):
+        detail_fields = [
+            field for field in ("agenda", "prerequisites")
+            if _has_col(live_class_doctype, field)
+        ]
+        lc = frappe.db.get_value(
+            live_class_doctype,
+            class_id,
+            get_live_class_fields(live_class_doctype) + detail_fields,
+            as_dict=True
+        )
+        if not lc:
             return {
                 "success": False,
                 "message": _("Live class not found")
             }
 
-        lc = frappe.get_doc(live_class_doctype, class_id)
-
         instructor_info = {"id": "", "name": "", "avatar": ""}
-        instructor_id = lc.instructor if hasattr(lc, 'instructor') else lc.owner
-        if instructor_id and frappe.db.exists("User", instructor_id):
-            user = frappe.get_doc("User", instructor_id)
+        instructor_id = lc.instructor if "instructor" in lc else lc.owner
+        user = get_instructors_bulk([instructor_id]).get(instructor_id)
+        if user:
             instructor_info = {
                 "id": instructor_id,
                 "name": user.full_name or instructor_id,
@@ -1723,21 +2792,21 @@ def get_live_class(class_id=None):
             "success": True,
             "liveClass": {
                 "id": lc.name,
-                "title": lc.title if hasattr(lc, 'title') else lc.name,
-                "description": lc.description if hasattr(lc, 'description') else "",
-                "courseId": lc.course if hasattr(lc, 'course') else "",
+                "title": lc.title if "title" in lc else lc.name,
+                "description": lc.get("description", ""),
+                "courseId": lc.get("course", ""),
                 "instructor": instructor_info,
-                "startTime": str(lc.start_time) if hasattr(lc, 'start_time') else "",
-                "endTime": str(lc.end_time) if hasattr(lc, 'end_time') else "",
-                "duration": lc.duration if hasattr(lc, 'duration') else "",
-                "status": lc.status if hasattr(lc, 'status') else "scheduled",
-                "meetingUrl": lc.meeting_url if hasattr(lc, 'meeting_url') else "",
-                "meetingId": lc.meeting_id if hasattr(lc, 'meeting_id') else "",
-                "maxParticipants": cint(lc.max_participants) if hasattr(lc, 'max_participants') else 0,
-                "isRecorded": bool(lc.is_recorded) if hasattr(lc, 'is_recorded') else False,
-                "recordingUrl": lc.recording_url if hasattr(lc, 'recording_url') else "",
-                "agenda": lc.agenda if hasattr(lc, 'agenda') else "",
-                "prerequisites": lc.prerequisites if hasattr(lc, 'prerequisites') else "",
+                "startTime": str(lc.start_time) if "start_time" in lc else "",
+                "endTime": str(lc.end_time) if "end_time" in lc else "",
+                "duration": lc.get("duration", ""),
+                "status": lc.get("status", "scheduled"),
+                "meetingUrl": lc.get("meeting_url", ""),
+                "meetingId": lc.get("meeting_id", ""),
+                "maxParticipants": cint(lc.get("max_participants")),
+                "isRecorded": bool(lc.get("is_recorded")),
+                "recordingUrl": lc.get("recording_url", ""),
+                "agenda": lc.get("agenda", ""),
+                "prerequisites": lc.get("prerequisites", ""),
                 "createdAt": str(lc.creation)
             }
         }
@@ -1798,46 +2867,42 @@ def create_live_class(
                 "message": _("Title is required")
             }
 
-        live_class_doctype = "LMS Live Class"
-        if not frappe.db.exists("DocType", live_class_doctype):
-            if frappe.db.exists("DocType", "Live Class"):
-                live_class_doctype = "Live Class"
-            else:
-                return {
-                    "success": False,
-                    "message": _("Live class feature not configured. DocType not found.")
-                }
+        live_class_doctype = _live_class_doctype()
+        if not live_class_doctype:
+            return {
+                "success": False,
+                "message": _("Live class feature not configured. DocType not found.")
+            }
 
         lc = frappe.new_doc(live_class_doctype)
         lc.title = title
         lc.owner = current_user
 
-        if hasattr(lc, 'instructor'):
+        if _has_col(live_class_doctype, "instructor"):
             lc.instructor = current_user
-        if course_id and hasattr(lc, 'course'):
+        if course_id and _has_col(live_class_doctype, "course"):
             lc.course = course_id
-        if description and hasattr(lc, 'description'):
+        if description and _has_col(live_class_doctype, "description"):
             lc.description = description
-        if start_time and hasattr(lc, 'start_time'):
+        if start_time and _has_col(live_class_doctype, "start_time"):
             lc.start_time = start_time
-        if end_time and hasattr(lc, 'end_time'):
+        if end_time and _has_col(live_class_doctype, "end_time"):
             lc.end_time = end_time
-        if duration and hasattr(lc, 'duration'):
+        if duration and _has_col(live_class_doctype, "duration"):
             lc.duration = duration
-        if meeting_url and hasattr(lc, 'meeting_url'):
+        if meeting_url and _has_col(live_class_doctype, "meeting_url"):
             lc.meeting_url = meeting_url
-        if max_participants and hasattr(lc, 'max_participants'):
+        if max_participants and _has_col(live_class_doctype, "max_participants"):
             lc.max_participants = cint(max_participants)
-        if is_recorded and hasattr(lc, 'is_recorded'):
+        if is_recorded and _has_col(live_class_doctype, "is_recorded"):
             lc.is_recorded = 1
-        if agenda and hasattr(lc, 'agenda'):
+        if agenda and _has_col(live_class_doctype, "agenda"):
             lc.agenda = agenda
 
-        if hasattr(lc, 'status'):
+        if _has_col(live_class_doctype, "status"):
             lc.status = "scheduled"
 
         lc.insert()
-        frappe.db.commit()
 
         return {
             "success": True,
@@ -1853,6 +2918,44 @@ def create_live_class(
         }
 
 
+def add_live_class_attendee(class_id, user):
+    """
+    Record `user` in a live class's attendee set, so a join costs O(1) whatever the class size
+
+    Attendees recorded before the set existed live in a JSON list under
+    live_class_attendance:{class_id}; the first join that creates the set
+    copies that list into it, so the participant count never restarts from one.
+
+    Returns:
+        (added, participant_count): whether the user is new to the class, and
+        the number of attendees after the join
+    """
+    cache = frappe.cache()
+    attendance_key = cache.make_key(f"live_class_attendees:{class_id}")
+
+    pipe = cache.pipeline()
+    pipe.sadd(attendance_key, user)
+    pipe.scard(attendance_key)
+    pipe.expire(attendance_key, 86400)
+    added, participant_count, _expired = pipe.execute()
+
+    # A set of one was just created by this join; fold in any legacy attendee list
+    if participant_count == 1:
+        legacy_key = f"live_class_attendance:{class_id}"
+        legacy = cache.get_value(legacy_key)
+        previous = json_loads(legacy) if isinstance(legacy, (str, bytes)) else legacy
+        if previous:
+            pipe = cache.pipeline()
+            pipe.sadd(attendance_key, *previous)
+            pipe.scard(attendance_key)
+            _seeded, participant_count = pipe.execute()
+            added = user not in previous
+        if legacy is not None:
+            cache.delete_value(legacy_key)
+
+    return bool(added), participant_count
+
+
 @frappe.whitelist()
 def join_live_class(class_id=None):
     """
@@ -1881,26 +2984,27 @@ def join_live_class(class_id=None):
                 "message": _("Live class ID is required")
             }
 
-        live_class_doctype = "LMS Live Class"
-        if not frappe.db.exists("DocType", live_class_doctype):
-            if frappe.db.exists("DocType", "Live Class"):
-                live_class_doctype = "Live Class"
-            else:
-                return {
-                    "success": False,
-                    "message": _("Live class feature not configured")
-                }
+        live_class_doctype = _live_class_doctype()
+        if not live_class_doctype:
+            return {
+                "success": False,
+                "message": _("Live class feature not configured")
+            }
 
-        if not frappe.db.exists(live_class_doctype, class_id):
+        lc = frappe.db.get_value(
+            live_class_doctype,
+            class_id,
+            ["name"] + [field for field in ("status", "meeting_url") if _has_col(live_class_doctype, field)],
+            as_dict=True
+        )
+        if not lc:
             return {
                 "success": False,
                 "message": _("Live class not found")
             }
 
-        lc = frappe.get_doc(live_class_doctype, class_id)
-
         # Check if class is live or scheduled
-        status = lc.status if hasattr(lc, 'status') else "scheduled"
+        status = lc.get("status") if _has_col(live_class_doctype, "status") else "scheduled"
         if status == "completed":
             return {
                 "success": False,
@@ -1912,25 +3016,16 @@ def join_live_class(class_id=None):
                 "message": _("This live class has been cancelled")
             }
 
-        # Record attendance (using cache if doctype doesn't exist)
-        attendance_key = f"live_class_attendance:{class_id}"
-        attendees = frappe.cache().get_value(attendance_key)
-        if attendees:
-            attendees = json.loads(attendees)
-        else:
-            attendees = []
-
-        if current_user not in attendees:
-            attendees.append(current_user)
-            frappe.cache().set_value(attendance_key, json.dumps(attendees), expires_in_sec=86400)
+        added, participant_count = add_live_class_attendee(class_id, current_user)
 
-            # Update participant count if field exists
-            if hasattr(lc, 'current_participants'):
-                lc.current_participants = len(attendees)
-                lc.save(ignore_permissions=True)
-                frappe.db.commit()
+        # Update participant count if field exists
+        if added and _has_col(live_class_doctype, "current_participants"):
+            frappe.db.set_value(
+                live_class_doctype, class_id, "current_participants", participant_count,
+                update_modified=False
+            )
 
-        meeting_url = lc.meeting_url if hasattr(lc, 'meeting_url') else ""
+        meeting_url = lc.get("meeting_url") if _has_col(live_class_doctype, "meeting_url") else ""
 
         return {
             "success": True,
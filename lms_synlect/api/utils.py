@@ -0,0 +1,69 @@
+"""
+Shared helpers for the React frontend API endpoints
+"""
+
+import frappe
+import inspect
+import json
+from functools import wraps
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_loads(data):
+    """Parse JSON text or bytes, using orjson when it is available"""
+    if orjson is not None:
+        # orjson accepts bytes, bytearray, memoryview and str directly
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def get_json_body():
+    """Parse the request's JSON body once per request; {} when absent or not a JSON object"""
+    if "json_body" not in frappe.flags:
+        body = {}
+        request = getattr(frappe.local, "request", None)
+        if request and request.data:
+            try:
+                body = json_loads(request.data)
+            except ValueError:
+                body = {}
+        frappe.flags.json_body = body if isinstance(body, dict) else {}
+
+    return frappe.flags.json_body
+
+
+def json_body(fn=None, *, aliases=None):
+    """
+    Merge the JSON request body into a whitelisted endpoint's keyword arguments
+
+    Body values take precedence over query/form arguments. Body keys found in
+    `aliases` ({body_key: param_name}) are renamed first, so the frontend's
+    camelCase keys reach snake_case parameters. Keys that are not parameters of
+    the endpoint are dropped.
+
+    Usage:
+        @frappe.whitelist()
+        @json_body(aliases={"pageSize": "page_size"})
+        def get_courses(page=1, page_size=10):
+            ...
+    """
+    def decorator(fn):
+        params = frozenset(inspect.signature(fn).parameters)
+        alias_map = aliases or {}
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            kwargs = {key: value for key, value in kwargs.items() if key in params}
+            for key, value in get_json_body().items():
+                key = alias_map.get(key, key)
+                if key in params:
+                    kwargs[key] = value
+            return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator(fn) if fn else decorator
@@ -145,6 +145,68 @@ web_include_js = [
 # 	}
 # }
 
+doc_events = {
+    "User": {
+        "on_update": [
+            "lms_synlect.api.auth.clear_user_profile_cache",
+            "lms_synlect.api.course.clear_instructor_caches"
+        ],
+        "on_trash": [
+            "lms_synlect.api.auth.clear_user_profile_cache",
+            "lms_synlect.api.course.clear_instructor_caches"
+        ]
+    },
+    "LMS Course": {
+        "on_update": [
+            "lms_synlect.api.course.clear_course_card_cache",
+            "lms_synlect.api.course.invalidate_categories_cache",
+            "lms_synlect.api.course.invalidate_instructors_cache",
+            "lms_synlect.api.course.invalidate_featured_courses_cache"
+        ],
+        "on_trash": [
+            "lms_synlect.api.course.clear_course_card_cache",
+            "lms_synlect.api.course.invalidate_categories_cache",
+            "lms_synlect.api.course.invalidate_instructors_cache",
+            "lms_synlect.api.course.invalidate_featured_courses_cache"
+        ]
+    },
+    "LMS Category": {
+        "on_update": "lms_synlect.api.course.invalidate_categories_cache",
+        "on_trash": "lms_synlect.api.course.invalidate_categories_cache"
+    },
+    "LMS Enrollment": {
+        "after_insert": "lms_synlect.api.course.clear_course_card_cache",
+        "on_update": "lms_synlect.api.course.clear_course_card_cache",
+        "on_trash": "lms_synlect.api.course.clear_course_card_cache"
+    },
+    "LMS Course Review": {
+        "on_update": "lms_synlect.api.course.clear_course_card_cache",
+        "on_trash": "lms_synlect.api.course.clear_course_card_cache"
+    },
+    "Course Chapter": {
+        "after_insert": [
+            "lms_synlect.api.course.clear_course_card_cache",
+            "lms_synlect.api.course.clear_course_lesson_count"
+        ],
+        "on_update": "lms_synlect.api.course.clear_course_lesson_count",
+        "on_trash": [
+            "lms_synlect.api.course.clear_course_card_cache",
+            "lms_synlect.api.course.clear_course_lesson_count"
+        ]
+    },
+    "Course Lesson": {
+        "after_insert": [
+            "lms_synlect.api.course.clear_course_card_cache",
+            "lms_synlect.api.course.clear_course_lesson_count"
+        ],
+        "on_update": "lms_synlect.api.course.clear_course_lesson_count",
+        "on_trash": [
+            "lms_synlect.api.course.clear_course_card_cache",
+            "lms_synlect.api.course.clear_course_lesson_count"
+        ]
+    }
+}
+
 # Scheduled Tasks
 # ---------------
 
@@ -0,0 +1,9 @@
+import frappe
+
+
+def execute():
+    """Index the per-user lookups made on the login/me path"""
+    if frappe.db.table_exists("LMS Enrollment"):
+        frappe.db.add_index("LMS Enrollment", ["member"])
+
+    frappe.db.add_index("Has Role", ["parent", "role"])
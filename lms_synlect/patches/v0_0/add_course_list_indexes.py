@@ -0,0 +1,20 @@
+import frappe
+
+
+def execute():
+    """Index the course listing filters/sorts and the per-course aggregate lookups"""
+    if not frappe.db.table_exists("LMS Course"):
+        return
+
+    for columns in (["published", "category", "creation"], ["published", "paid", "course_price"]):
+        if all(frappe.db.has_column("LMS Course", column) for column in columns):
+            frappe.db.add_index("LMS Course", columns)
+
+    for doctype, column in (
+        ("LMS Enrollment", "course"),
+        ("Course Chapter", "course"),
+        ("Course Lesson", "chapter"),
+        ("LMS Course Review", "course"),
+    ):
+        if frappe.db.table_exists(doctype) and frappe.db.has_column(doctype, column):
+            frappe.db.add_index(doctype, [column])
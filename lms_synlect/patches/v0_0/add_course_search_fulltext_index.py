@@ -0,0 +1,25 @@
+import frappe
+
+from lms_synlect.api.course import COURSE_SEARCH_INDEX
+
+
+def execute():
+    """Add the FULLTEXT index get_courses searches course titles and introductions with"""
+    if frappe.db.db_type != "mariadb" or not frappe.db.table_exists("LMS Course"):
+        return
+
+    if frappe.db.sql("SHOW INDEX FROM `tabLMS Course` WHERE Key_name = %s", COURSE_SEARCH_INDEX):
+        return
+
+    columns = [
+        column for column in ("title", "short_introduction")
+        if frappe.db.has_column("LMS Course", column)
+    ]
+    if not columns:
+        return
+
+    frappe.db.sql_ddl(
+        "ALTER TABLE `tabLMS Course` ADD FULLTEXT INDEX `{0}` ({1})".format(
+            COURSE_SEARCH_INDEX, ", ".join(f"`{column}`" for column in columns)
+        )
+    )
@@ -0,0 +1,12 @@
+import frappe
+
+
+def execute():
+    """Index the live class listing filters, which order upcoming classes by start_time"""
+    for doctype in ("LMS Live Class", "Live Class"):
+        if not frappe.db.table_exists(doctype):
+            continue
+
+        for columns in (["course", "start_time"], ["start_time"]):
+            if all(frappe.db.has_column(doctype, column) for column in columns):
+                frappe.db.add_index(doctype, columns)